@@ -1,12 +1,24 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import NamedTuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from database import SessionLocal, User
+from database import User, get_db
 from fastapi import HTTPException, status, Depends
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordBearer
+from cache import LRUCache, principal_cache, user_tag
+import crud_async
 
 # OAuth2 scheme for reading token from Authorization header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
+# same, for endpoints that also serve anonymous users
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token", auto_error=False)
 
 # Настройки из .env
 SECRET_KEY = "supersecretkey123"
@@ -18,15 +30,53 @@ pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_user_by_email(email: str):
-    db = SessionLocal()
-    user = db.query(User).filter(User.email == email).first()
-    db.close()
-    return user
 
-def authenticate_user(email: str, password: str):
-    user = get_user_by_email(email)
-    if not user or not verify_password(password, user.password_hash):
+class PasswordHasher:
+    """Runs password hashing/verification on a dedicated, bounded thread pool.
+
+    PBKDF2 is deliberately slow; run inline it would stall the event loop (and every other
+    request on the worker). hashlib releases the GIL while hashing, so threads are enough and
+    the pool is kept apart from the threadpool that serves sync endpoints. At most
+    `max_pending` calls may be queued or running; beyond that callers get 503 right away
+    instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Слишком много запросов авторизации, повторите позже",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 16))),
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(pwd_context.hash, password)
+
+
+def get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await crud_async.get_user_by_email(db, email)
+    if not user or not await password_hasher.run(verify_password, password, user.password_hash):
         return False
     return user
 
@@ -41,24 +91,85 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+# ---------- CURRENT USER ----------
+
+class Principal(NamedTuple):
+    """The authenticated user as seen by endpoints (they only need the identity)."""
+    id: int
+    email: str
+    username: str
+    is_active: bool
+
+
+# token -> subject; in-process only, saves jwt.decode on repeated tokens
+_token_cache = LRUCache(max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "4096")), ttl=principal_cache.backend.ttl)
+
+
+def _token_subject(token: str):
+    email = _token_cache.get(token)
+    if email is not None:
+        return email
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    email = payload.get("sub")
+    if email is not None:
+        # never outlive the token itself
+        ttl = min(_token_cache.ttl, payload.get("exp", 0) - time.time())
+        if ttl > 0:
+            _token_cache.set(token, email, ttl)
+    return email
+
+
+def invalidate_principal(email: str):
+    principal_cache.invalidate(user_tag(email))
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """Resolve the bearer token to a Principal.
+
+    Principals are cached per subject; on a miss the user is loaded through the request's
+    own session (get_db is cached per request), so a hit costs no database round trip.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
+    email = _token_subject(token)
+    if email is None:
         raise credentials_exception
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.email == email).first()
-    finally:
-        db.close()
-    if user is None:
+
+    def load():
+        user = get_user_by_email(db, email)
+        # unknown users are not cached: they may register any moment
+        return Principal(user.id, user.email, user.username, user.is_active is not False)._asdict() if user else None
+
+    data = principal_cache.get_or_set(f"principal:{email}", load, tags=[user_tag(email)])
+    if data is None or not data["is_active"]:
         raise credentials_exception
-    return user
\ No newline at end of file
+    return Principal(**data)
+
+
+def get_optional_user(token: str = Depends(optional_oauth2_scheme), db: Session = Depends(get_db)):
+    """Principal of the request, or None without an Authorization header (invalid tokens are still 401)."""
+    return get_current_user(token, db) if token else None
+
+
+# Changes to users made through the ORM drop their cached principals once committed
+# (bulk UPDATEs bypass these events and have to call invalidate_principal themselves).
+
+def _user_changed(mapper, connection, target):
+    emails = {target.email, *inspect(target).attrs.email.history.deleted}
+    object_session(target).info.setdefault("changed_user_emails", set()).update(emails)
+
+
+def _invalidate_changed_users(session):
+    for email in session.info.pop("changed_user_emails", ()):
+        invalidate_principal(email)
+
+
+event.listen(User, "after_update", _user_changed)
+event.listen(User, "after_delete", _user_changed)
+event.listen(Session, "after_commit", _invalidate_changed_users)
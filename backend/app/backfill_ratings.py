@@ -0,0 +1,58 @@
+# backend/app/backfill_ratings.py
+"""Rebuild recipes.rating_count / rating_sum / rating_avg from the reviews table.
+
+create_review and delete_review keep the aggregates current; this job fills them in for data
+loaded around them and repairs drift. Recipes are processed by id range, one transaction per
+batch, and only rows whose values are wrong are written.
+
+Repaired recipes are invalidated in recipe_cache. That reaches the API's cache only when both
+share a store (CACHE_URL); with the in-memory backend the API keeps serving cached ratings
+until they expire (RECIPE_CACHE_TTL) or it restarts.
+
+Usage:
+    python backfill_ratings.py [--batch-size 50000]
+"""
+
+import argparse
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from cache import recipe_cache, recipe_tag, RECIPE_LISTS_TAG
+from database import SessionLocal, rating_aggregates_update_sql
+
+DEFAULT_BATCH_SIZE = 50000
+
+
+def backfill_ratings(db: Session, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """Repair every recipe's rating aggregates; returns how many rows were fixed."""
+    started = time.monotonic()
+    low, high = db.execute(text("SELECT coalesce(min(id), 1), coalesce(max(id), 0) FROM recipes")).one()
+    update = text(rating_aggregates_update_sql("r.id BETWEEN :lo AND :hi") + "RETURNING r.id")
+    fixed = 0
+    for start in range(low, high + 1, batch_size):
+        ids = db.execute(update, {"lo": start, "hi": start + batch_size - 1}).scalars().all()
+        db.commit()
+        if ids:
+            # tag bumps, not clear(): they go through the backend the API reads
+            recipe_cache.invalidate(RECIPE_LISTS_TAG, *(recipe_tag(i) for i in ids))
+        fixed += len(ids)
+    return {"fixed": fixed, "seconds": round(time.monotonic() - started, 3)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild recipe rating aggregates from reviews")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="recipes per transaction")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        report = backfill_ratings(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Fixed rating aggregates of {report['fixed']} recipes in {report['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+# backend/app/bulk_import.py
+"""Bulk recipe import from NDJSON or a JSON array of RecipeCreate objects.
+
+Records are parsed and validated one at a time and written in batches, so memory use
+depends on the batch size, not on the file size. A batch the database rejects is retried
+record by record, so the valid records of it are still imported. Files may start with a
+UTF-8 BOM.
+
+Usage:
+    python bulk_import.py recipes.ndjson --author-email alice@example.com [--batch-size 1000]
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+from typing import Iterator, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from cache import recipe_cache, RECIPE_LISTS_TAG
+from crud import create_recipes_bulk
+from database import SessionLocal, User
+import schemas
+
+DEFAULT_BATCH_SIZE = 1000
+READ_CHUNK_SIZE = 64 * 1024
+# a single record larger than this is treated as a malformed file rather than buffered further
+MAX_RECORD_SIZE = 16 * 1024 * 1024
+# per-batch error lists are truncated so a completely broken file does not blow up the report
+MAX_ERRORS_PER_BATCH = 20
+
+
+def _iter_json_array(stream: TextIO, buffer: str) -> Iterator:
+    """Yield the elements of a top-level JSON array, decoding it chunk by chunk."""
+    decoder = json.JSONDecoder()
+    pos = buffer.index("[") + 1
+    eof = False
+    while True:
+        # skip separators between elements
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            chunk = stream.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+        if pos >= len(buffer):
+            raise ValueError("Unexpected end of JSON array")
+        if buffer[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof or len(buffer) - pos > MAX_RECORD_SIZE:
+                raise
+            chunk = stream.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        if end == len(buffer) and not eof:
+            # a number at the end of the buffer may be cut in half, re-decode with more input
+            chunk = stream.read(READ_CHUNK_SIZE)
+            eof = not chunk
+            if chunk:
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+        yield obj
+        buffer, pos = buffer[end:], 0
+
+
+def iter_records(stream: TextIO) -> Iterator:
+    """Yield raw records from NDJSON or a JSON array (detected by the first character)."""
+    buffer = ""
+    while not buffer.strip():
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        buffer += chunk
+    if buffer.lstrip().startswith("["):
+        yield from _iter_json_array(stream, buffer)
+        return
+
+    # NDJSON: one object per line; a malformed line is reported, not fatal
+    pending = buffer
+    while True:
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if line.strip():
+                yield line
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        pending += chunk
+    if pending.strip():
+        yield pending
+
+
+def _parse(record) -> schemas.RecipeCreate:
+    if isinstance(record, str):
+        record = json.loads(record)
+    if not isinstance(record, dict):
+        raise ValueError("record is not a JSON object")
+    return schemas.RecipeCreate(**record)
+
+
+def _import_one_by_one(db: Session, batch: list, author_id: int, errors: list) -> int:
+    """Retry a failed batch record by record, so one bad row costs only itself."""
+    imported = 0
+    for record_no, recipe in batch:
+        try:
+            create_recipes_bulk(db, [recipe], author_id)
+            db.commit()
+            imported += 1
+        except Exception as e:
+            db.rollback()
+            errors.append({"record": record_no, "error": str(e).split("\n", 1)[0]})
+    errors.sort(key=lambda err: err["record"])
+    return imported
+
+
+def _flush(db: Session, batch: list, batch_no: int, author_id: int, report: dict, errors: list, invalid: int):
+    imported = 0
+    if batch:
+        try:
+            create_recipes_bulk(db, [recipe for _, recipe in batch], author_id)
+            db.commit()
+            imported = len(batch)
+        except Exception:
+            db.rollback()
+            imported = _import_one_by_one(db, batch, author_id, errors)
+    report["imported"] += imported
+    report["failed"] += len(batch) - imported + invalid
+    report["batches"].append({
+        "batch": batch_no,
+        "imported": imported,
+        "errors": errors[:MAX_ERRORS_PER_BATCH],
+        "error_count": len(errors),
+    })
+
+
+def import_recipes(db: Session, stream: TextIO, author_id: int, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """Stream-import recipes for `author_id`.
+
+    Returns a report with totals, per-batch errors (record numbers are 0-based) and throughput.
+    """
+    started = time.monotonic()
+    report = {"imported": 0, "failed": 0, "batches": []}
+    batch, errors, invalid = [], [], 0
+    record_no = -1
+    try:
+        for record_no, record in enumerate(iter_records(stream)):
+            try:
+                batch.append((record_no, _parse(record)))
+            except (ValueError, TypeError, ValidationError) as e:
+                invalid += 1
+                errors.append({"record": record_no, "error": str(e)})
+            if len(batch) + invalid >= batch_size:
+                _flush(db, batch, len(report["batches"]), author_id, report, errors, invalid)
+                batch, errors, invalid = [], [], 0
+    except ValueError as e:
+        # the file itself is malformed (e.g. a broken JSON array): keep what was read so far
+        errors.append({"record": record_no + 1, "error": f"import stopped: {e}"})
+    if batch or errors:
+        _flush(db, batch, len(report["batches"]), author_id, report, errors, invalid)
+
+    if report["imported"]:
+        recipe_cache.invalidate(RECIPE_LISTS_TAG)
+    elapsed = time.monotonic() - started
+    report["records"] = record_no + 1
+    report["seconds"] = round(elapsed, 3)
+    report["recipes_per_second"] = round(report["imported"] / elapsed, 1) if elapsed > 0 else None
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import recipes (NDJSON or JSON array of RecipeCreate)")
+    parser.add_argument("path", help="file to import, '-' for stdin")
+    parser.add_argument("--author-email", required=True, help="existing user the recipes are attributed to")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        author = db.query(User).filter(User.email == args.author_email).first()
+        if not author:
+            parser.error(f"user {args.author_email} not found")
+        # utf-8-sig: files saved by Windows editors start with a BOM
+        if args.path == "-":
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig")
+        else:
+            stream = open(args.path, encoding="utf-8-sig")
+        with stream:
+            report = import_recipes(db, stream, author.id, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    for batch in report["batches"]:
+        for err in batch["errors"]:
+            print(f"batch {batch['batch']}, record {err['record']}: {err['error']}", file=sys.stderr)
+    print(
+        f"Imported {report['imported']} of {report['records']} recipes "
+        f"({report['failed']} failed) in {report['seconds']}s, {report['recipes_per_second']} recipes/s"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+# backend/app/cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Iterable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+
+# ---------- BACKENDS ----------
+
+class CacheBackend:
+    """Key/value store used by TaggedCache.
+
+    Implementations: LRUCache (per process) and RedisBackend (shared between workers).
+    """
+
+    # calls do network I/O; async callers run them in the thread pool, off the event loop
+    blocking = True
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def get_many(self, keys: list) -> list:
+        return [self.get(k) for k in keys]
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def incr(self, key) -> int:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LRUCache(CacheBackend):
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss/eviction counters.
+
+    Bounded by number of entries; the least recently used entry is evicted first.
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        # incr() counters live outside the LRU: evicting a tag version would revive stale entries
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def json_default(value):
+    """`default=` hook for json.dumps: datetimes as ISO 8601, Decimals as floats."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def content_etag(payload) -> str:
+    """Strong ETag for a JSON-serializable payload (hash of its canonical JSON form)."""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=json_default)
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+class RedisBackend(CacheBackend):
+    """Shared backend over a Redis-compatible client (``get``/``mget``/``set``/``delete``/``incr``).
+
+    Values are stored as JSON, so every worker sees the same entries and the same tag versions.
+    Any object with that client interface works, e.g. a dict-backed fake in tests.
+    """
+
+    def __init__(self, client, ttl: float = 300.0, prefix: str = "cookbook:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        import redis  # optional dependency, only needed when CACHE_URL points to redis
+
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _load(self, raw):
+        return None if raw is None else json.loads(raw)
+
+    def get(self, key):
+        return self._load(self.client.get(self.prefix + key))
+
+    def get_many(self, keys: list) -> list:
+        if not keys:
+            return []
+        return [self._load(raw) for raw in self.client.mget([self.prefix + k for k in keys])]
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        raw = json.dumps(value, default=json_default)
+        self.client.set(self.prefix + key, raw, ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "ttl": self.ttl}
+
+
+# ---------- TAG-VERSIONED CACHE ----------
+
+class TaggedCache:
+    """Cache whose entries are invalidated by tag.
+
+    Every tag has a version counter in the backend, and the versions of an entry's tags are part
+    of its key. ``invalidate(tag)`` bumps the counter, so all entries carrying that tag become
+    unreachable at once (and age out by TTL/LRU) while other entries stay valid.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: str, tags: Iterable[str]) -> str:
+        tags = sorted(tags)
+        if not tags:
+            return key
+        versions = self.backend.get_many([f"tag:{t}" for t in tags])
+        return key + "|" + ",".join(f"{t}={v or 0}" for t, v in zip(tags, versions))
+
+    def get(self, key: str, tags: Iterable[str] = ()):
+        value = self.backend.get(self._key(key, tags))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value, tags: Iterable[str] = (), ttl: Optional[float] = None):
+        self.backend.set(self._key(key, tags), value, ttl)
+
+    def get_or_set(self, key: str, loader: Callable, tags: Iterable[str] = (), ttl: Optional[float] = None):
+        tags = list(tags)
+        full_key = self._key(key, tags)
+        value = self.backend.get(full_key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = loader()
+        self.backend.set(full_key, value, ttl)
+        return value
+
+    async def _acall(self, fn: Callable, *args):
+        if not self.backend.blocking:
+            return fn(*args)
+        return await run_in_threadpool(fn, *args)
+
+    async def aget_or_set(self, key: str, loader: Callable, tags: Iterable[str] = (), ttl: Optional[float] = None):
+        """``get_or_set`` for async loaders (`loader` returns an awaitable).
+
+        Calls to a blocking backend (Redis) run in the thread pool so they don't stall the event loop.
+        """
+        tags = list(tags)
+        full_key = await self._acall(self._key, key, tags)
+        value = await self._acall(self.backend.get, full_key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = await loader()
+        await self._acall(self.backend.set, full_key, value, ttl)
+        return value
+
+    def invalidate(self, *tags: str):
+        for tag in tags:
+            self.backend.incr(f"tag:{tag}")
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        return {**self.backend.stats(), "hits": self.hits, "misses": self.misses}
+
+
+# Tags used by crud.py
+RECIPE_LISTS_TAG = "recipes"
+
+
+def recipe_tag(recipe_id: int) -> str:
+    return f"recipe:{recipe_id}"
+
+
+# Tag used by auth.py; users are identified by email, the subject of their tokens
+def user_tag(email: str) -> str:
+    return f"user:{email}"
+
+
+def build_backend(
+    env_prefix: str = "RECIPE_CACHE", ttl: float = 300, max_entries: int = 2048, prefix: str = "cookbook:recipes:",
+) -> CacheBackend:
+    """Backend from the environment: CACHE_URL=redis://... for a shared store, in-memory otherwise.
+
+    TTL and LRU size come from ``<env_prefix>_TTL`` / ``<env_prefix>_MAX_ENTRIES``. In Redis every
+    cache keeps its keys and tag versions under its own `prefix`, so one cache's clear() or tags
+    never touch another's.
+    """
+    ttl = float(os.getenv(f"{env_prefix}_TTL", str(ttl)))
+    url = os.getenv("CACHE_URL")
+    if url:
+        return RedisBackend.from_url(url, ttl=ttl, prefix=prefix)
+    return LRUCache(max_entries=int(os.getenv(f"{env_prefix}_MAX_ENTRIES", str(max_entries))), ttl=ttl)
+
+
+# Serialized recipes and recipe pages
+recipe_cache = TaggedCache(build_backend())
+# Resolved principals of authenticated requests; short TTL as a bound on staleness
+principal_cache = TaggedCache(build_backend("AUTH_CACHE", ttl=60, max_entries=4096, prefix="cookbook:auth:"))
+
+
+def configure_cache(backend: CacheBackend):
+    """Swap the backend of ``recipe_cache`` (e.g. for a fake store in tests)."""
+    recipe_cache.backend = backend
+    recipe_cache.hits = recipe_cache.misses = 0
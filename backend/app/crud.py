@@ -1,18 +1,83 @@
 # backend/app/crud.py
 
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, select, func, text, tuple_, cast, update, delete, case, literal
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from passlib.hash import pbkdf2_sha256
-from typing import List
+from typing import List, Optional
+from datetime import datetime
+import base64
+import json
+import math
+import os
+import re
 
 # АБСОЛЮТНЫЕ ИМПОРТЫ
 from database import (
     User, Recipe, Ingredient, Review, Collection, ShoppingList, 
-    RecipeIngredients, CollectionRecipes
+    RecipeIngredients, CollectionRecipes, SEARCH_CONFIG, search_vector_update_sql,
+    RecipeFacetCube, COOK_TIME_BUCKETS,
 )
 import schemas
+from cache import recipe_cache, recipe_tag, content_etag, RECIPE_LISTS_TAG
+from ingredient_index import ingredient_index, normalize_name, record_recipes, record_deleted_recipe
+
+# How many of the most relevant full-text hits a search can page through (see search_recipes_page)
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "2000"))
+
+
+# ---------- PAGINATION ----------
+
+def encode_cursor(kind: str, key: list) -> str:
+    """Opaque page cursor: urlsafe base64 of the sort key of the last row returned."""
+    raw = json.dumps({"k": kind, "v": key}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def cursor_int(value) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(value)
+    return value
+
+
+def cursor_float(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(value)
+    return float(value)
+
+
+def cursor_datetime(value) -> datetime:
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return datetime.fromisoformat(value)
+
+
+def decode_cursor(cursor: str, kind: str, *types) -> list:
+    """Sort key from a cursor of `kind`, each part converted by the matching `types` entry.
+
+    Anything but a cursor made by ``encode_cursor(kind, ...)`` with that many parts of those
+    types is a 400, so a crafted cursor can never reach the SQL.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if data["k"] != kind:
+            raise ValueError(data["k"])
+        key = data["v"]
+        if not isinstance(key, list) or len(key) != len(types):
+            raise ValueError(key)
+        return [convert(value) for convert, value in zip(types, key)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+def _time_cursor(row) -> str:
+    return encode_cursor("t", [row.created_at.isoformat(), row.id])
+
+
+def _decode_time_cursor(cursor: str):
+    return decode_cursor(cursor, "t", cursor_datetime, cursor_int)
 
 
 # ---------- USER ----------
@@ -44,20 +109,48 @@ def get_user_by_id(db: Session, user_id: int):
 
 # ---------- INGREDIENTS ----------
 
+def get_or_create_ingredients(db: Session, items: List[tuple]):
+    """Resolve ``(name, unit)`` pairs to ingredient ids without committing.
+
+    One ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` creates the missing names and one SELECT
+    fetches the ones that already existed (or were inserted concurrently by another request).
+    Returns a dict ``name -> id``.
+    """
+    units = {}
+    for name, unit in items:
+        units.setdefault(name, unit)
+    if not units:
+        return {}
+    # sorted so concurrent uploads lock the unique index in the same order
+    names = sorted(units)
+    inserted = db.execute(
+        pg_insert(Ingredient)
+        .values([{"name": name, "default_unit": units[name]} for name in names])
+        .on_conflict_do_nothing(index_elements=[Ingredient.name])
+        .returning(Ingredient.id, Ingredient.name)
+    ).all()
+    ids = {name: ingredient_id for ingredient_id, name in inserted}
+    missing = [name for name in names if name not in ids]
+    if missing:
+        ids.update(
+            (name, ingredient_id)
+            for ingredient_id, name in db.execute(
+                select(Ingredient.id, Ingredient.name).where(Ingredient.name.in_(missing))
+            ).all()
+        )
+    return ids
+
+
 def get_or_create_ingredient(db: Session, name: str, unit: str = "г"):
-    ingredient = db.query(Ingredient).filter(Ingredient.name == name).first()
-    if ingredient:
-        return ingredient
-    ingredient = Ingredient(name=name, default_unit=unit)
-    db.add(ingredient)
+    ingredient_id = get_or_create_ingredients(db, [(name, unit)])[name]
     db.commit()
-    db.refresh(ingredient)
-    return ingredient
+    return db.get(Ingredient, ingredient_id)
 
 
 # ---------- RECIPES ----------
 
 def create_recipe(db: Session, recipe: schemas.RecipeCreate, author_id: int):
+    """Insert a recipe with its ingredients in a single transaction."""
     db_recipe = Recipe(
         title=recipe.title,
         description=recipe.description,
@@ -70,92 +163,458 @@ def create_recipe(db: Session, recipe: schemas.RecipeCreate, author_id: int):
         author_id=author_id,
     )
     db.add(db_recipe)
-    db.commit()
-    db.refresh(db_recipe)
+    db.flush()
 
-    # Добавление ингредиентов
-    for item in recipe.ingredients:
-        ingredient = get_or_create_ingredient(db, item.name, item.unit)
+    # Добавление ингредиентов: один upsert + один SELECT, затем один executemany
+    ingredient_ids = get_or_create_ingredients(db, [(item.name, item.unit) for item in recipe.ingredients])
+    if recipe.ingredients:
         db.execute(
-            RecipeIngredients.insert().values(
-                recipe_id=db_recipe.id,
-                ingredient_id=ingredient.id,
-                quantity=item.quantity,
-                unit=item.unit,
-            )
+            RecipeIngredients.insert(),
+            [
+                {
+                    "recipe_id": db_recipe.id,
+                    "ingredient_id": ingredient_ids[item.name],
+                    "quantity": item.quantity,
+                    "unit": item.unit,
+                }
+                for item in recipe.ingredients
+            ],
         )
+    record_recipes(db, {db_recipe.id: set(ingredient_ids.values())}, ingredient_ids)
+    refresh_search_vectors(db, [db_recipe.id])
     db.commit()
     # Return serialized recipe matching response schema (include ingredient quantity/unit)
-    return serialize_recipe(db, db_recipe)
+    data = serialize_recipe(db, db_recipe)
+    recipe_cache.invalidate(RECIPE_LISTS_TAG)
+    return data
+
+
+def create_recipes_bulk(db: Session, recipes: List[schemas.RecipeCreate], author_id: int) -> List[int]:
+    """Insert a batch of recipes in one transaction and return their ids.
+
+    Ingredients for the whole batch are resolved with one upsert, recipes and their
+    ``recipe_ingredients`` rows are written with one executemany each. The caller commits.
+    """
+    if not recipes:
+        return []
+    ingredient_ids = get_or_create_ingredients(
+        db, [(item.name, item.unit) for recipe in recipes for item in recipe.ingredients]
+    )
+    recipe_table = Recipe.__table__
+    recipe_ids = db.execute(
+        recipe_table.insert().returning(recipe_table.c.id, sort_by_parameter_order=True),
+        [
+            {
+                "title": recipe.title,
+                "description": recipe.description,
+                "cook_time": recipe.cook_time,
+                "category": recipe.category,
+                "diet": recipe.diet,
+                "cuisine": recipe.cuisine,
+                "steps": [step.dict() for step in recipe.steps],
+                "image": recipe.image,
+                "author_id": author_id,
+                "rating_avg": 0.0,
+            }
+            for recipe in recipes
+        ],
+    ).scalars().all()
+    rows = [
+        {
+            "recipe_id": recipe_id,
+            "ingredient_id": ingredient_ids[item.name],
+            "quantity": item.quantity,
+            "unit": item.unit,
+        }
+        for recipe_id, recipe in zip(recipe_ids, recipes)
+        for item in recipe.ingredients
+    ]
+    if rows:
+        db.execute(RecipeIngredients.insert(), rows)
+    record_recipes(
+        db,
+        {
+            recipe_id: {ingredient_ids[item.name] for item in recipe.ingredients}
+            for recipe_id, recipe in zip(recipe_ids, recipes)
+        },
+        ingredient_ids,
+    )
+    refresh_search_vectors(db, recipe_ids)
+    return list(recipe_ids)
+
+
+def _with_etag(items, next_cursor):
+    return items, next_cursor, content_etag([items, next_cursor])
+
+
+# Statement builders and row post-processing are shared with the async layer (crud_async.py).
+
+# Orders of the recipe listing: newest first, or best rated first (from the stored aggregates)
+RECIPE_SORTS = ("new", "rating")
+
+
+def _recipes_page_stmt(limit: int, cursor: Optional[str], skip: int, sort: str = "new", conditions=()):
+    stmt = select(Recipe).where(*conditions)
+    if sort == "rating":
+        if cursor:
+            last_rating, last_id = decode_cursor(cursor, "a", cursor_float, cursor_int)
+            stmt = stmt.where(tuple_(Recipe.rating_avg, Recipe.id) < tuple_(last_rating, last_id))
+        stmt = stmt.order_by(Recipe.rating_avg.desc(), Recipe.id.desc())
+    else:
+        if cursor:
+            created_at, last_id = _decode_time_cursor(cursor)
+            stmt = stmt.where(tuple_(Recipe.created_at, Recipe.id) < tuple_(created_at, last_id))
+        stmt = stmt.order_by(Recipe.created_at.desc(), Recipe.id.desc())
+    if not cursor:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+
+def _time_next_cursor(rows: list, limit: Optional[int]) -> Optional[str]:
+    return _time_cursor(rows[-1]) if rows and len(rows) == limit else None
+
+
+def _recipes_next_cursor(recipes: list, limit: int, sort: str) -> Optional[str]:
+    if sort == "rating":
+        if not recipes or len(recipes) != limit:
+            return None
+        return encode_cursor("a", [recipes[-1].rating_avg, recipes[-1].id])
+    return _time_next_cursor(recipes, limit)
+
+
+def _search_tsquery(q: str):
+    """Build a prefix tsquery (``word1:* & word2:*``) from free text, or None if it has no words."""
+    words = re.findall(r"\w+", q.lower())
+    if not words:
+        return None
+    return func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{w}:*" for w in words))
+
+
+def _search_rank(tsquery):
+    # float8 so the rank survives the round trip through the cursor exactly
+    return cast(func.ts_rank_cd(Recipe.search_vector, tsquery), DOUBLE_PRECISION)
+
+
+def _search_candidates(tsquery):
+    # the most relevant hits (top-N sort, so memory stays bounded); ties broken by id so the
+    # set is fixed for a given catalogue and every page ranks the same rows
+    return (
+        select(Recipe.id)
+        .where(Recipe.search_vector.op("@@")(tsquery))
+        .order_by(_search_rank(tsquery).desc(), Recipe.id.desc())
+        .limit(SEARCH_MAX_CANDIDATES)
+    )
+
+
+def _search_stmt(tsquery, limit: int, cursor: Optional[str], skip: int, conditions=()):
+    # filters narrow the candidates rather than widen the search, so the facet counts of
+    # filter_recipes_page (counted over the same candidates) describe exactly these rows
+    candidates = _search_candidates(tsquery)
+    rank = _search_rank(tsquery)
+    stmt = select(Recipe, rank).where(Recipe.id.in_(candidates), *conditions)
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor, "r", cursor_float, cursor_int)
+        stmt = stmt.where(tuple_(rank, Recipe.id) < tuple_(last_rank, last_id))
+    stmt = stmt.order_by(rank.desc(), Recipe.id.desc())
+    if not cursor:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+
+def _search_next_cursor(rows: list, limit: int) -> Optional[str]:
+    if not rows or len(rows) != limit:
+        return None
+    last_recipe, last_rank = rows[-1]
+    return encode_cursor("r", [last_rank, last_recipe.id])
+
+
+def _fuzzy_search_stmt(q: str, limit: int):
+    """Typo-tolerant fallback: pg_trgm ``%`` on titles and ingredient names (both GIN-indexed)."""
+    matching_ingredients = select(Ingredient.id).where(Ingredient.name.op("%")(q))
+    matching_recipes = select(RecipeIngredients.c.recipe_id).where(
+        RecipeIngredients.c.ingredient_id.in_(matching_ingredients)
+    )
+    return (
+        select(Recipe)
+        .where(or_(Recipe.title.op("%")(q), Recipe.id.in_(matching_recipes)))
+        .order_by(func.similarity(Recipe.title, q).desc(), Recipe.id.desc())
+        .limit(limit)
+    )
+
+
+def _recipe_ingredients_stmt(recipe_ids: List[int]):
+    return (
+        select(
+            RecipeIngredients.c.recipe_id,
+            RecipeIngredients.c.quantity,
+            RecipeIngredients.c.unit,
+            Ingredient.name,
+            Ingredient.default_unit,
+        )
+        .join(Ingredient, Ingredient.id == RecipeIngredients.c.ingredient_id)
+        .where(RecipeIngredients.c.recipe_id.in_(recipe_ids))
+        .order_by(RecipeIngredients.c.recipe_id, RecipeIngredients.c.id)
+    )
+
+
+def _group_ingredients(recipe_ids: List[int], rows) -> dict:
+    items = {rid: [] for rid in recipe_ids}
+    for r in rows:
+        try:
+            qty = float(r['quantity'] or 0)
+        except Exception:
+            qty = 0.0
+        items[r['recipe_id']].append({
+            'name': r['name'],
+            'quantity': qty,
+            'unit': r['unit'] or r['default_unit'] or 'г',
+        })
+    return items
+
+
+def get_recipes_page(db: Session, limit: int = 50, cursor: Optional[str] = None, skip: int = 0, sort: str = "new"):
+    """Page of recipes, the cursor for the next one and the page's ETag.
+
+    `sort` is "new" (newest first) or "rating" (best rated first). With `cursor` the page is
+    located by keyset on ``(created_at, id)`` / ``(rating_avg, id)`` so deep pages cost the
+    same as the first; without it the legacy `skip` offset is used. Pages are cached until
+    the next recipe write.
+    """
+    items, next_cursor, etag = recipe_cache.get_or_set(
+        f"recipes:page:{sort}:{limit}:{skip}:{cursor}",
+        lambda: _with_etag(*_get_recipes_page(db, limit, cursor, skip, sort)),
+        tags=[RECIPE_LISTS_TAG],
+    )
+    return items, next_cursor, etag
+
+
+def _get_recipes_page(db: Session, limit: int, cursor: Optional[str], skip: int, sort: str = "new"):
+    recipes = db.execute(_recipes_page_stmt(limit, cursor, skip, sort)).scalars().all()
+    return serialize_recipes(db, recipes), _recipes_next_cursor(recipes, limit, sort)
 
 
 def get_all_recipes(db: Session, skip: int = 0, limit: int = 50):
-    recipes = db.query(Recipe).offset(skip).limit(limit).all()
-    return [serialize_recipe(db, r) for r in recipes]
+    return get_recipes_page(db, limit=limit, skip=skip)[0]
 
 
-def search_recipes(db: Session, q: str, skip: int = 0, limit: int = 50):
+def search_recipes_page(db: Session, q: str, limit: int = 50, cursor: Optional[str] = None, skip: int = 0):
     """Search recipes by title/description/category/cuisine and ingredient name.
 
-    Uses ILIKE pattern matching. Returns serialized recipes.
+    Matches against the GIN-indexed ``recipes.search_vector`` and orders by ``ts_rank_cd``.
+    Every hit is ranked and the ``SEARCH_MAX_CANDIDATES`` most relevant can be paged through,
+    so an old recipe that matches best still comes first. The tradeoff: ranking reads the
+    vector of every hit, so very common terms cost time proportional to their hit count
+    (memory stays bounded by the top-N sort), and results past the cap are not reachable.
+    When nothing matches, falls back to trigram similarity on titles and ingredient names so
+    typos still find something.
+
+    Returns serialized recipes, the next cursor (keyed on ``(rank, id)``) and the ETag.
+    Results are cached until the next recipe write.
     """
-    if not q:
-        return get_all_recipes(db, skip=skip, limit=limit)
+    items, next_cursor, etag = recipe_cache.get_or_set(
+        f"recipes:search:{limit}:{skip}:{cursor}:{q}",
+        lambda: _with_etag(*_search_recipes_page(db, q, limit, cursor, skip)),
+        tags=[RECIPE_LISTS_TAG],
+    )
+    return items, next_cursor, etag
 
-    pattern = f"%{q}%"
-    # Join through the association table to include ingredient name matches
-    query = (
-        db.query(Recipe)
-        .outerjoin(RecipeIngredients, Recipe.id == RecipeIngredients.c.recipe_id)
-        .outerjoin(Ingredient, Ingredient.id == RecipeIngredients.c.ingredient_id)
-        .filter(
-            or_(
-                Recipe.title.ilike(pattern),
-                Recipe.description.ilike(pattern),
-                Recipe.category.ilike(pattern),
-                Recipe.cuisine.ilike(pattern),
-                Ingredient.name.ilike(pattern),
-            )
-        )
-        .distinct()
-        .offset(skip)
-        .limit(limit)
+
+def _search_recipes_page(db: Session, q: str, limit: int, cursor: Optional[str], skip: int):
+    tsquery = _search_tsquery(q or "")
+    if tsquery is None:
+        return _get_recipes_page(db, limit, cursor, skip)
+
+    rows = db.execute(_search_stmt(tsquery, limit, cursor, skip)).all()
+    if not rows and skip == 0 and not cursor:
+        fuzzy = db.execute(_fuzzy_search_stmt(q, limit)).scalars().all()
+        return serialize_recipes(db, fuzzy), None
+    return serialize_recipes(db, [recipe for recipe, _ in rows]), _search_next_cursor(rows, limit)
+
+
+def search_recipes(db: Session, q: str, skip: int = 0, limit: int = 50):
+    return search_recipes_page(db, q, limit=limit, skip=skip)[0]
+
+
+# ---------- FACETS ----------
+
+# Facet name -> Recipe column; "cook_time" is counted and filtered by COOK_TIME_BUCKETS keys
+FACETS = ("category", "cuisine", "diet", "cook_time")
+
+
+def _filter_conditions(filters: dict) -> list:
+    conditions = [getattr(Recipe, f) == filters[f] for f in ("category", "cuisine", "diet") if filters.get(f)]
+    if filters.get("cook_time"):
+        low, high = COOK_TIME_BUCKETS[filters["cook_time"]]
+        conditions.append(Recipe.cook_time >= low)
+        if high is not None:
+            conditions.append(Recipe.cook_time < high)
+    return conditions
+
+
+def _facet_cube_stmt():
+    c = RecipeFacetCube.c
+    return select(c.category, c.cuisine, c.diet, c.cook_bucket, c.n).where(c.n > 0)
+
+
+def _search_facet_stmt(tsquery):
+    """Facet cells of the search candidates (see _search_stmt), in the shape of recipe_facet_cube rows."""
+    cell = (
+        func.coalesce(Recipe.category, ""),
+        func.coalesce(Recipe.cuisine, ""),
+        func.coalesce(Recipe.diet, ""),
+        func.cook_time_bucket(Recipe.cook_time),
     )
+    return select(*cell, func.count()).where(Recipe.id.in_(_search_candidates(tsquery))).group_by(*cell)
+
+
+def _search_hits_stmt(tsquery):
+    """Number of search hits, counted up to SEARCH_MAX_CANDIDATES + 1 (enough to see if there are more)."""
+    hits = select(Recipe.id).where(Recipe.search_vector.op("@@")(tsquery)).limit(SEARCH_MAX_CANDIDATES + 1)
+    return select(func.count()).select_from(hits.subquery())
+
+
+def _count_facets(cells: list, filters: dict):
+    """Total matching `filters` and per-facet value counts from (category, cuisine, diet, bucket, n) cells.
+
+    Each facet is counted with every filter except its own, so the sidebar also shows how
+    many recipes the other values of an already selected facet would give.
+    """
+    total = 0
+    counts = {f: {} for f in FACETS}
+    for *values, n in cells:
+        mismatched = [f for f, v in zip(FACETS, values) if filters.get(f) and v != filters[f]]
+        if not mismatched:
+            total += n
+        for facet, value in zip(FACETS, values):
+            if value and (not mismatched or mismatched == [facet]):
+                counts[facet][value] = counts[facet].get(value, 0) + n
+    facets = {f: dict(sorted(c.items(), key=lambda kv: (-kv[1], kv[0]))) for f, c in counts.items()}
+    return total, facets
+
+
+def _filter_payload(items: list, next_cursor: Optional[str], cells: list, filters: dict, hits: Optional[int] = None):
+    total, facets = _count_facets(cells, filters)
+    # with q, counts cover the SEARCH_MAX_CANDIDATES most relevant hits only
+    truncated = hits is not None and hits > SEARCH_MAX_CANDIDATES
+    data = {"items": items, "total": total, "facets": facets, "truncated": truncated}
+    return data, next_cursor, content_etag([data, next_cursor])
+
+
+def _filter_cache_key(q: Optional[str], filters: dict, sort: str, limit: int, cursor: Optional[str]) -> str:
+    return f"recipes:filter:{sort}:{limit}:{cursor}:{json.dumps(filters, sort_keys=True)}:{q}"
+
+
+def filter_recipes_page(
+    db: Session, q: Optional[str] = None, filters: Optional[dict] = None,
+    limit: int = 50, cursor: Optional[str] = None, sort: str = "new",
+):
+    """Recipes matching structured filters (and optionally a search query) with facet counts.
+
+    `filters` maps facet names (FACETS) to a single value each. Returns ``({items, total,
+    facets, truncated}, next_cursor, etag)``. Without `q`, counts come from the precomputed
+    recipe_facet_cube. With `q`, items and counts both come from the
+    ``SEARCH_MAX_CANDIDATES`` most relevant search hits, and `truncated` tells whether
+    there were more.
+    """
+    filters = {f: v for f, v in (filters or {}).items() if v}
+
+    def load():
+        conditions = _filter_conditions(filters)
+        tsquery = _search_tsquery(q) if q else None
+        if tsquery is not None:
+            rows = db.execute(_search_stmt(tsquery, limit, cursor, 0, conditions)).all()
+            recipes, next_cursor = [recipe for recipe, _ in rows], _search_next_cursor(rows, limit)
+            cells = [list(row) for row in db.execute(_search_facet_stmt(tsquery)).all()]
+            hits = db.execute(_search_hits_stmt(tsquery)).scalar()
+        else:
+            recipes = db.execute(_recipes_page_stmt(limit, cursor, 0, sort, conditions)).scalars().all()
+            next_cursor = _recipes_next_cursor(recipes, limit, sort)
+            cells, hits = get_facet_cube(db), None
+        return _filter_payload(serialize_recipes(db, recipes), next_cursor, cells, filters, hits)
+
+    data, next_cursor, etag = recipe_cache.get_or_set(
+        _filter_cache_key(q, filters, sort, limit, cursor), load, tags=[RECIPE_LISTS_TAG]
+    )
+    return data, next_cursor, etag
+
+
+def get_facet_cube(db: Session) -> list:
+    """All non-empty facet cells; cached until the next recipe write."""
+    return recipe_cache.get_or_set(
+        "recipes:facet-cube",
+        lambda: [list(row) for row in db.execute(_facet_cube_stmt()).all()],
+        tags=[RECIPE_LISTS_TAG],
+    )
+
 
-    recipes = query.all()
-    return [serialize_recipe(db, r) for r in recipes]
+# ---------- INGREDIENT MATCH ----------
+
+def match_recipes(db: Session, ingredients: List[str], max_missing: int = 2, limit: int = 20):
+    """Recipes cookable from `ingredients`: none missing first, then one missing, and so on.
+
+    Candidates and their order come from the in-memory ingredient index; only the page itself
+    is loaded from the database. Each item is a RecipeResponse dict plus ``missing`` and
+    ``missing_ingredients`` (names of the recipe's ingredients not in `ingredients`).
+    """
+    ingredient_index.sync()
+    resolved = ingredient_index.resolve(ingredients)
+    ids = set().union(*resolved.values()) if resolved else set()
+    matches = ingredient_index.match(ids, max_missing=max_missing, limit=limit)
+    if not matches:
+        return []
+    recipes = {r.id: r for r in db.execute(select(Recipe).where(Recipe.id.in_([m[0] for m in matches]))).scalars()}
+    # deleted by another worker since the index last saw them
+    matches = [(recipe_id, missing) for recipe_id, missing in matches if recipe_id in recipes]
+    items = serialize_recipes(db, [recipes[recipe_id] for recipe_id, _ in matches])
+    have = {normalize_name(name) for name in ingredients}
+    for item, (_, missing) in zip(items, matches):
+        item["missing"] = missing
+        item["missing_ingredients"] = list(dict.fromkeys(
+            i["name"] for i in item["ingredients"] if normalize_name(i["name"]) not in have
+        ))
+    return items
+
+
+def refresh_search_vectors(db: Session, recipe_ids: List[int]):
+    """Recompute ``search_vector`` for the given recipes (call after their ingredients change)."""
+    if not recipe_ids:
+        return
+    db.execute(text(search_vector_update_sql("r.id = ANY(:ids)")), {"ids": list(recipe_ids)})
+
+
+def get_recipe_entry(db: Session, recipe_id: int):
+    """Serialized recipe and its ETag, served from ``recipe_cache`` when possible."""
+    data, etag = recipe_cache.get_or_set(
+        f"recipe:{recipe_id}", lambda: _load_recipe(db, recipe_id), tags=[recipe_tag(recipe_id)]
+    )
+    return data, etag
 
 
 def get_recipe_by_id(db: Session, recipe_id: int):
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    return get_recipe_entry(db, recipe_id)[0]
+
+
+def _load_recipe(db: Session, recipe_id: int):
+    recipe = db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Рецепт не найден")
-    return serialize_recipe(db, recipe)
+    data = serialize_recipe(db, recipe)
+    return data, content_etag(data)
 
 
-def serialize_recipe(db: Session, recipe: Recipe):
-    """Serialize Recipe ORM to a dict compatible with RecipeResponse.
+def load_recipe_ingredients(db: Session, recipe_ids: List[int]):
+    """Load ingredient items for many recipes with a single joined query.
 
-    Ingredients' quantity and unit are stored in the association table `recipe_ingredients`.
-    We pull those rows and combine with Ingredient.name/default_unit.
+    Returns a dict ``recipe_id -> [{'name', 'quantity', 'unit'}, ...]``; rows keep
+    their insertion order so the output matches what ``serialize_recipe`` used to build.
     """
-    # fetch association rows
-    rows = db.execute(RecipeIngredients.select().where(RecipeIngredients.c.recipe_id == recipe.id)).mappings().all()
-    ingredients_list = []
-    for r in rows:
-        ing = db.query(Ingredient).filter(Ingredient.id == r['ingredient_id']).first()
-        if not ing:
-            continue
-        try:
-            qty = float(r.get('quantity') or 0)
-        except Exception:
-            qty = 0.0
-        ingredients_list.append({
-            'name': ing.name,
-            'quantity': qty,
-            'unit': r.get('unit') or ing.default_unit or 'г',
-        })
+    if not recipe_ids:
+        return {}
+    rows = db.execute(_recipe_ingredients_stmt(recipe_ids)).mappings().all()
+    return _group_ingredients(recipe_ids, rows)
+
 
+def _recipe_to_dict(recipe: Recipe, ingredients_list: list):
     return {
         'id': recipe.id,
         'author_id': recipe.author_id,
@@ -168,17 +627,68 @@ def serialize_recipe(db: Session, recipe: Recipe):
         'steps': recipe.steps,
         'ingredients': ingredients_list,
         'image': recipe.image,
+        'image_variants': recipe.image_variants,
         'rating_avg': recipe.rating_avg,
         'created_at': recipe.created_at,
     }
 
 
+def serialize_recipes(db: Session, recipes: List[Recipe]):
+    """Serialize a page of Recipe ORM objects to dicts compatible with RecipeResponse.
+
+    Ingredients' quantity and unit are stored in the association table `recipe_ingredients`;
+    they are fetched for the whole page at once, so the cost does not grow with page size.
+    """
+    ingredients = load_recipe_ingredients(db, [r.id for r in recipes])
+    return [_recipe_to_dict(r, ingredients[r.id]) for r in recipes]
+
+
+def serialize_recipe(db: Session, recipe: Recipe):
+    """Serialize a single Recipe ORM object (see ``serialize_recipes``)."""
+    return serialize_recipes(db, [recipe])[0]
+
+
+def _recipes_in_order(recipe_ids: List[int], serialized: list):
+    """Items in the order of `recipe_ids`, None where a recipe does not exist, and the missing ids."""
+    by_id = {item["id"]: item for item in serialized}
+    return [by_id.get(recipe_id) for recipe_id in recipe_ids], [r for r in recipe_ids if r not in by_id]
+
+
+def get_recipes_by_ids(db: Session, recipe_ids: List[int]):
+    """Serialize many recipes by id with one ``IN`` query and one ingredient query.
+
+    Returns ``(items, not_found)``: items follow `recipe_ids` (None for unknown ids).
+    """
+    recipes = db.execute(select(Recipe).where(Recipe.id.in_(set(recipe_ids)))).scalars().all() if recipe_ids else []
+    return _recipes_in_order(recipe_ids, serialize_recipes(db, recipes))
+
+
+def iter_recipe_batches(db: Session, batch_size: int = 1000):
+    """Yield every recipe, serialized, in batches of `batch_size` ordered by id.
+
+    Recipes are read through a server-side cursor (``yield_per``) and ingredients are loaded
+    once per batch, so a full scan is one pass over the table with constant memory.
+    """
+    result = db.execute(
+        select(Recipe).order_by(Recipe.id).execution_options(yield_per=batch_size)
+    ).scalars()
+    for recipes in result.partitions():
+        yield serialize_recipes(db, recipes)
+
+
 def delete_recipe(db: Session, recipe_id: int, user_id: int):
-    recipe = get_recipe_by_id(db, recipe_id)
+    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    if not recipe:
+        raise HTTPException(status_code=404, detail="Рецепт не найден")
     if recipe.author_id != user_id:
         raise HTTPException(status_code=403, detail="Нет прав на удаление рецепта")
-    db.delete(recipe)
+    # a statement, not db.delete(recipe): the ORM unit of work expects one recipe_ingredients
+    # row per linked ingredient and fails on recipes listing an ingredient twice. Ingredient
+    # links, reviews and collection entries go with the recipe via ON DELETE CASCADE.
+    db.execute(delete(Recipe).where(Recipe.id == recipe_id))
+    record_deleted_recipe(db, recipe_id)
     db.commit()
+    recipe_cache.invalidate(recipe_tag(recipe_id), RECIPE_LISTS_TAG)
     return {"message": "Рецепт удалён"}
 
 
@@ -200,13 +710,84 @@ def create_review(db: Session, recipe_id: int, user_id: int, review: schemas.Rev
         comment=review.comment,
     )
     db.add(db_review)
+    db.flush()
+    # same transaction as the insert; the row lock serializes concurrent reviews of a recipe
+    db.execute(update(Recipe).where(Recipe.id == recipe_id).values(**rating_delta_values(review.rating, 1)))
     db.commit()
     db.refresh(db_review)
+    # the review changes the recipe's rating shown on its page and in lists
+    recipe_cache.invalidate(recipe_tag(recipe_id), RECIPE_LISTS_TAG)
     return db_review
 
 
+def delete_review(db: Session, recipe_id: int, user_id: int):
+    """Delete `user_id`'s review of the recipe and take it out of the rating aggregates."""
+    db_review = (
+        db.query(Review)
+        .filter(Review.recipe_id == recipe_id, Review.user_id == user_id)
+        .first()
+    )
+    if not db_review:
+        raise HTTPException(status_code=404, detail="Отзыв не найден")
+    db.delete(db_review)
+    db.flush()
+    db.execute(update(Recipe).where(Recipe.id == recipe_id).values(**rating_delta_values(-db_review.rating, -1)))
+    db.commit()
+    recipe_cache.invalidate(recipe_tag(recipe_id), RECIPE_LISTS_TAG)
+    return {"message": "Отзыв удалён"}
+
+
+def rating_delta_values(rating_delta: int, count_delta: int) -> dict:
+    """SET clause adding a review (+rating, +1) to or removing one (-rating, -1) from a recipe.
+
+    Computed from the row's current values inside the UPDATE, so it is atomic; rating_avg is
+    derived exactly as in database.RATING_AGGREGATES_UPDATE.
+    """
+    count = Recipe.rating_count + count_delta
+    total = Recipe.rating_sum + rating_delta
+    return {
+        "rating_count": count,
+        "rating_sum": total,
+        "rating_avg": case((count > 0, cast(total, DOUBLE_PRECISION) / count), else_=0.0),
+        # a new rating is not an edit of the recipe
+        "updated_at": Recipe.updated_at,
+    }
+
+
+def _reviews_page_stmt(recipe_id: int, limit: Optional[int], cursor: Optional[str], skip: int):
+    stmt = select(Review).where(Review.recipe_id == recipe_id)
+    if cursor:
+        created_at, last_id = _decode_time_cursor(cursor)
+        stmt = stmt.where(tuple_(Review.created_at, Review.id) < tuple_(created_at, last_id))
+    stmt = stmt.order_by(Review.created_at.desc(), Review.id.desc())
+    if not cursor:
+        stmt = stmt.offset(skip)
+    return stmt if limit is None else stmt.limit(limit)
+
+
+def _reviews_version_stmt(recipe_id: int):
+    return select(func.count(Review.id), func.max(Review.id)).where(Review.recipe_id == recipe_id)
+
+
+def get_reviews_page(
+    db: Session, recipe_id: int, limit: Optional[int] = None, cursor: Optional[str] = None, skip: int = 0
+):
+    """Newest-first reviews of a recipe, keyset-paginated on ``(created_at, id)``.
+
+    Without `limit` every review is returned, as before pagination existed.
+    """
+    reviews = db.execute(_reviews_page_stmt(recipe_id, limit, cursor, skip)).scalars().all()
+    return reviews, _time_next_cursor(reviews, limit)
+
+
+def get_reviews_version(db: Session, recipe_id: int) -> str:
+    """Cheap validator for a recipe's reviews (reviews are never edited, only added or removed)."""
+    count, last_id = db.execute(_reviews_version_stmt(recipe_id)).one()
+    return f"{count}:{last_id}"
+
+
 def get_reviews_for_recipe(db: Session, recipe_id: int):
-    return db.query(Review).filter(Review.recipe_id == recipe_id).all()
+    return get_reviews_page(db, recipe_id)[0]
 
 
 # ---------- COLLECTIONS ----------
@@ -224,17 +805,165 @@ def create_collection(db: Session, user_id: int, collection: schemas.CollectionC
     return db_collection
 
 
-def add_recipe_to_collection(db: Session, collection_id: int, recipe_id: int):
-    db.execute(
-        CollectionRecipes.insert().values(
-            collection_id=collection_id,
-            recipe_id=recipe_id
+def add_recipes_to_collection(db: Session, collection_id: int, recipe_ids: List[int]) -> List[int]:
+    """Add recipes to a collection in one statement; returns the ids actually added.
+
+    Recipes already in the collection and unknown recipe ids are skipped, not errors.
+    """
+    if not recipe_ids:
+        return []
+    added = db.execute(
+        pg_insert(CollectionRecipes)
+        .from_select(
+            ["collection_id", "recipe_id"],
+            select(literal(collection_id), Recipe.id).where(Recipe.id.in_(set(recipe_ids))).order_by(Recipe.id),
         )
-    )
+        .on_conflict_do_nothing(index_elements=[CollectionRecipes.c.collection_id, CollectionRecipes.c.recipe_id])
+        .returning(CollectionRecipes.c.recipe_id)
+    ).scalars().all()
     db.commit()
+    return list(added)
+
+
+def add_recipe_to_collection(db: Session, collection_id: int, recipe_id: int):
+    if not add_recipes_to_collection(db, collection_id, [recipe_id]):
+        if not db.get(Recipe, recipe_id):
+            raise HTTPException(status_code=404, detail="Рецепт не найден")
+        return {"message": "Рецепт уже в коллекции"}
     return {"message": "Рецепт добавлен в коллекцию"}
 
 
+# Collections are read with their recipes as lightweight cards: one query for the collections,
+# one for the cards of all of them (top N per collection by a window function) and one for
+# the recipe counts, however many collections are on the page.
+
+# Cards shown per collection in collection lists; the rest is paged through the detail endpoint
+COLLECTION_PREVIEW_SIZE = 4
+
+
+def _collections_page_stmt(conditions, limit: int, cursor: Optional[str]):
+    stmt = select(Collection).where(*conditions)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, "c", cursor_int)
+        stmt = stmt.where(Collection.id < last_id)
+    return stmt.order_by(Collection.id.desc()).limit(limit)
+
+
+def _collections_next_cursor(collections: list, limit: int) -> Optional[str]:
+    if len(collections) < limit:
+        return None
+    return encode_cursor("c", [collections[-1].id])
+
+
+def _collection_cards_stmt(collection_ids: List[int], per_collection: int, cursor: Optional[str] = None):
+    """Newest-added recipe cards of each collection (order of ``collection_recipes.id``)."""
+    entry_id = CollectionRecipes.c.id
+    position = func.row_number().over(partition_by=CollectionRecipes.c.collection_id, order_by=entry_id.desc())
+    entries = select(
+        CollectionRecipes.c.collection_id, entry_id.label("entry_id"), CollectionRecipes.c.recipe_id,
+        position.label("position"),
+    ).where(CollectionRecipes.c.collection_id.in_(collection_ids))
+    if cursor:
+        (last_entry,) = decode_cursor(cursor, "e", cursor_int)
+        entries = entries.where(entry_id < last_entry)
+    entries = entries.subquery()
+    return (
+        select(
+            entries.c.collection_id, entries.c.entry_id,
+            Recipe.id, Recipe.title, Recipe.image, Recipe.rating_avg, Recipe.cook_time,
+        )
+        .join(Recipe, Recipe.id == entries.c.recipe_id)
+        .where(entries.c.position <= per_collection)
+        .order_by(entries.c.collection_id, entries.c.entry_id.desc())
+    )
+
+
+def _collection_counts_stmt(collection_ids: List[int]):
+    return (
+        select(CollectionRecipes.c.collection_id, func.count())
+        .where(CollectionRecipes.c.collection_id.in_(collection_ids))
+        .group_by(CollectionRecipes.c.collection_id)
+    )
+
+
+def _collection_payload(collections: list, card_rows, counts, per_collection: int) -> list:
+    cards = {c.id: [] for c in collections}
+    last_entry = {}
+    for row in card_rows:
+        cards[row.collection_id].append({
+            "id": row.id,
+            "title": row.title,
+            "image": row.image,
+            "rating_avg": row.rating_avg,
+            "cook_time": row.cook_time,
+        })
+        last_entry[row.collection_id] = row.entry_id
+    counts = dict(counts)
+    return [
+        {
+            "id": c.id,
+            "user_id": c.user_id,
+            "title": c.title,
+            "description": c.description,
+            "is_public": c.is_public,
+            "created_at": c.created_at,
+            "recipe_count": counts.get(c.id, 0),
+            "recipes": cards[c.id],
+            # cursor for GET /api/collections/{id} to continue after these cards
+            "next_cursor": encode_cursor("e", [last_entry[c.id]]) if len(cards[c.id]) == per_collection else None,
+        }
+        for c in collections
+    ]
+
+
+def _visible_collections(user_id: Optional[int], viewer_id: Optional[int]) -> list:
+    conditions = [] if user_id is None else [Collection.user_id == user_id]
+    if user_id is None or user_id != viewer_id:
+        conditions.append(Collection.is_public.is_not(False))
+    return conditions
+
+
+def list_collections(
+    db: Session, user_id: Optional[int] = None, viewer_id: Optional[int] = None,
+    limit: int = 20, cursor: Optional[str] = None,
+):
+    """Newest collections with a preview of their recipes; keyset-paginated on id.
+
+    Without `user_id` all public collections, otherwise the user's (private ones only to the
+    user themselves, `viewer_id`).
+    """
+    collections = db.execute(
+        _collections_page_stmt(_visible_collections(user_id, viewer_id), limit, cursor)
+    ).scalars().all()
+    if not collections:
+        return [], None
+    ids = [c.id for c in collections]
+    card_rows = db.execute(_collection_cards_stmt(ids, COLLECTION_PREVIEW_SIZE)).all()
+    counts = db.execute(_collection_counts_stmt(ids)).all()
+    return (
+        _collection_payload(collections, card_rows, counts, COLLECTION_PREVIEW_SIZE),
+        _collections_next_cursor(collections, limit),
+    )
+
+
+def _get_visible_collection(collection: Optional[Collection], viewer_id: Optional[int]) -> Collection:
+    # private collections of other users are indistinguishable from missing ones
+    if not collection or (collection.is_public is False and collection.user_id != viewer_id):
+        raise HTTPException(status_code=404, detail="Коллекция не найдена")
+    return collection
+
+
+def get_collection(
+    db: Session, collection_id: int, viewer_id: Optional[int] = None, limit: int = 20, cursor: Optional[str] = None,
+):
+    """A collection with one page of its recipe cards, newest added first."""
+    collection = _get_visible_collection(db.get(Collection, collection_id), viewer_id)
+    card_rows = db.execute(_collection_cards_stmt([collection_id], limit, cursor)).all()
+    counts = db.execute(_collection_counts_stmt([collection_id])).all()
+    data = _collection_payload([collection], card_rows, counts, limit)[0]
+    return data, data.pop("next_cursor")
+
+
 # ---------- SHOPPING LISTS ----------
 
 def create_shopping_list(db: Session, user_id: int, data: schemas.ShoppingListCreate):
@@ -250,5 +979,81 @@ def create_shopping_list(db: Session, user_id: int, data: schemas.ShoppingListCr
     return db_list
 
 
+# unit -> (base unit, factor); quantities in other units are summed as they are
+UNIT_FACTORS = {
+    "г": ("г", 1), "гр": ("г", 1), "g": ("г", 1), "кг": ("г", 1000), "kg": ("г", 1000),
+    "мл": ("мл", 1), "ml": ("мл", 1), "л": ("мл", 1000), "l": ("мл", 1000),
+    "шт": ("шт", 1), "pcs": ("шт", 1),
+}
+# base unit -> (larger unit, factor) used for totals of at least one larger unit
+UNIT_DISPLAY = {"г": ("кг", 1000), "мл": ("л", 1000)}
+
+
+def _normalize_unit(unit: Optional[str]):
+    """``(base unit, factor)`` for a known unit; other units come back exactly as written."""
+    if not unit:
+        return "г", 1
+    return UNIT_FACTORS.get(unit.strip().lower().rstrip("."), (unit, 1))
+
+
+def aggregate_ingredients(rows, servings: dict) -> List[dict]:
+    """Sum ``(recipe_id, name, quantity, unit)`` rows into shopping-list items.
+
+    Quantities are scaled by ``servings[recipe_id]`` and converted to a base unit (кг -> г,
+    л -> мл), so "500 г" and "1 кг" of the same ingredient become "1.5 кг". Names are merged
+    case-insensitively; amounts in units that do not convert stay separate items.
+    """
+    totals = {}
+    for recipe_id, name, quantity, unit in rows:
+        base_unit, factor = _normalize_unit(unit)
+        # "ст. л." and "Ст. л" are one item, shown as first written
+        key = (normalize_name(name), normalize_name(base_unit))
+        entry = totals.setdefault(key, {"ingredient": name, "quantity": 0.0, "unit": base_unit})
+        entry["quantity"] += float(quantity or 0) * factor * servings[recipe_id]
+    items = []
+    for entry in totals.values():
+        display = UNIT_DISPLAY.get(entry["unit"])
+        if display and entry["quantity"] >= display[1]:
+            entry["unit"], entry["quantity"] = display[0], entry["quantity"] / display[1]
+        entry["quantity"] = round(entry["quantity"], 3)
+        items.append(entry)
+    return sorted(items, key=lambda item: normalize_name(item["ingredient"]))
+
+
+def generate_shopping_list(db: Session, user_id: int, data: schemas.ShoppingListGenerate):
+    """Create a shopping list from recipes and serving multipliers.
+
+    The ingredients of all recipes are read with one query (recipes without ingredients
+    included, so unknown ids are detected by the same query) and merged server-side.
+    """
+    servings = {}
+    for entry in data.recipes:
+        # the same recipe listed twice is cooked twice
+        servings[entry.recipe_id] = servings.get(entry.recipe_id, 0) + entry.servings
+    if not servings:
+        raise HTTPException(status_code=400, detail="Список рецептов пуст")
+    rows = db.execute(
+        select(Recipe.id, Ingredient.name, RecipeIngredients.c.quantity, RecipeIngredients.c.unit)
+        .select_from(Recipe)
+        .outerjoin(RecipeIngredients, RecipeIngredients.c.recipe_id == Recipe.id)
+        .outerjoin(Ingredient, Ingredient.id == RecipeIngredients.c.ingredient_id)
+        .where(Recipe.id.in_(list(servings)))
+    ).all()
+    missing = set(servings) - {row.id for row in rows}
+    if missing:
+        missing_ids = ", ".join(map(str, sorted(missing)))
+        raise HTTPException(status_code=404, detail=f"Рецепты не найдены: {missing_ids}")
+    db_list = ShoppingList(
+        user_id=user_id,
+        title=data.title,
+        recipes=list(servings),
+        items=aggregate_ingredients([row for row in rows if row.name is not None], servings),
+    )
+    db.add(db_list)
+    db.commit()
+    db.refresh(db_list)
+    return db_list
+
+
 def get_user_shopping_lists(db: Session, user_id: int):
     return db.query(ShoppingList).filter(ShoppingList.user_id == user_id).all()
\ No newline at end of file
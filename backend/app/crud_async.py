@@ -0,0 +1,245 @@
+# backend/app/crud_async.py
+"""Async (AsyncSession) versions of the read functions in crud.py (and of user creation).
+
+Statements, cursors, cache keys and serialization are shared with crud.py, so the sync and
+async paths return identical data and hit the same cache entries.
+"""
+
+from typing import Optional, List
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import User, Recipe, Collection, read_from_primary
+import schemas
+from cache import recipe_cache, recipe_tag, content_etag, RECIPE_LISTS_TAG
+from crud import (
+    _with_etag,
+    _recipes_page_stmt,
+    _time_next_cursor,
+    _recipes_next_cursor,
+    _search_tsquery,
+    _search_stmt,
+    _search_next_cursor,
+    _fuzzy_search_stmt,
+    _recipe_ingredients_stmt,
+    _group_ingredients,
+    _recipe_to_dict,
+    _recipes_in_order,
+    _reviews_page_stmt,
+    _reviews_version_stmt,
+    _filter_conditions,
+    _facet_cube_stmt,
+    _search_facet_stmt,
+    _search_hits_stmt,
+    _filter_payload,
+    _filter_cache_key,
+    COLLECTION_PREVIEW_SIZE,
+    _collections_page_stmt,
+    _collections_next_cursor,
+    _collection_cards_stmt,
+    _collection_counts_stmt,
+    _collection_payload,
+    _visible_collections,
+    _get_visible_collection,
+)
+
+
+# ---------- USER ----------
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate, password_hash: str):
+    """Like crud.create_user, but takes the hash so it can be computed off the event loop."""
+    db_user = User(
+        email=user.email,
+        username=user.username,
+        password_hash=password_hash,
+    )
+    db.add(db_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email уже зарегистрирован")
+    await db.refresh(db_user)
+    return db_user
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return await db.get(User, user_id)
+
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+
+# ---------- RECIPES ----------
+
+async def _cached(db: AsyncSession, key: str, load, tags):
+    """recipe_cache.aget_or_set whose misses are read from the primary.
+
+    A miss usually follows a write's invalidation, and a lagging replica would answer with
+    the old data, which would then be cached under the new tag version for the whole TTL.
+    """
+    async def load_from_primary():
+        read_from_primary(db)
+        return await load()
+
+    return await recipe_cache.aget_or_set(key, load_from_primary, tags=tags)
+
+
+async def load_recipe_ingredients(db: AsyncSession, recipe_ids: List[int]):
+    if not recipe_ids:
+        return {}
+    rows = (await db.execute(_recipe_ingredients_stmt(recipe_ids))).mappings().all()
+    return _group_ingredients(recipe_ids, rows)
+
+
+async def serialize_recipes(db: AsyncSession, recipes: List[Recipe]):
+    ingredients = await load_recipe_ingredients(db, [r.id for r in recipes])
+    return [_recipe_to_dict(r, ingredients[r.id]) for r in recipes]
+
+
+async def get_recipes_page(
+    db: AsyncSession, limit: int = 50, cursor: Optional[str] = None, skip: int = 0, sort: str = "new"
+):
+    """See crud.get_recipes_page."""
+    async def load():
+        return _with_etag(*await _get_recipes_page(db, limit, cursor, skip, sort))
+
+    items, next_cursor, etag = await _cached(
+        db, f"recipes:page:{sort}:{limit}:{skip}:{cursor}", load, [RECIPE_LISTS_TAG]
+    )
+    return items, next_cursor, etag
+
+
+async def _get_recipes_page(db: AsyncSession, limit: int, cursor: Optional[str], skip: int, sort: str = "new"):
+    recipes = (await db.execute(_recipes_page_stmt(limit, cursor, skip, sort))).scalars().all()
+    return await serialize_recipes(db, recipes), _recipes_next_cursor(recipes, limit, sort)
+
+
+async def search_recipes_page(db: AsyncSession, q: str, limit: int = 50, cursor: Optional[str] = None, skip: int = 0):
+    """See crud.search_recipes_page."""
+    async def load():
+        return _with_etag(*await _search_recipes_page(db, q, limit, cursor, skip))
+
+    items, next_cursor, etag = await _cached(
+        db, f"recipes:search:{limit}:{skip}:{cursor}:{q}", load, [RECIPE_LISTS_TAG]
+    )
+    return items, next_cursor, etag
+
+
+async def _search_recipes_page(db: AsyncSession, q: str, limit: int, cursor: Optional[str], skip: int):
+    tsquery = _search_tsquery(q or "")
+    if tsquery is None:
+        return await _get_recipes_page(db, limit, cursor, skip)
+
+    rows = (await db.execute(_search_stmt(tsquery, limit, cursor, skip))).all()
+    if not rows and skip == 0 and not cursor:
+        fuzzy = (await db.execute(_fuzzy_search_stmt(q, limit))).scalars().all()
+        return await serialize_recipes(db, fuzzy), None
+    return await serialize_recipes(db, [recipe for recipe, _ in rows]), _search_next_cursor(rows, limit)
+
+
+async def filter_recipes_page(
+    db: AsyncSession, q: Optional[str] = None, filters: Optional[dict] = None,
+    limit: int = 50, cursor: Optional[str] = None, sort: str = "new",
+):
+    """See crud.filter_recipes_page."""
+    filters = {f: v for f, v in (filters or {}).items() if v}
+
+    async def load():
+        conditions = _filter_conditions(filters)
+        tsquery = _search_tsquery(q) if q else None
+        if tsquery is not None:
+            rows = (await db.execute(_search_stmt(tsquery, limit, cursor, 0, conditions))).all()
+            recipes, next_cursor = [recipe for recipe, _ in rows], _search_next_cursor(rows, limit)
+            cells = [list(row) for row in (await db.execute(_search_facet_stmt(tsquery))).all()]
+            hits = (await db.execute(_search_hits_stmt(tsquery))).scalar()
+        else:
+            recipes = (await db.execute(_recipes_page_stmt(limit, cursor, 0, sort, conditions))).scalars().all()
+            next_cursor = _recipes_next_cursor(recipes, limit, sort)
+            cells, hits = await get_facet_cube(db), None
+        return _filter_payload(await serialize_recipes(db, recipes), next_cursor, cells, filters, hits)
+
+    data, next_cursor, etag = await _cached(
+        db, _filter_cache_key(q, filters, sort, limit, cursor), load, [RECIPE_LISTS_TAG]
+    )
+    return data, next_cursor, etag
+
+
+async def get_facet_cube(db: AsyncSession) -> list:
+    """See crud.get_facet_cube."""
+    async def load():
+        return [list(row) for row in (await db.execute(_facet_cube_stmt())).all()]
+
+    return await _cached(db, "recipes:facet-cube", load, [RECIPE_LISTS_TAG])
+
+
+async def get_recipe_entry(db: AsyncSession, recipe_id: int):
+    """See crud.get_recipe_entry."""
+    async def load():
+        recipe = await db.get(Recipe, recipe_id)
+        if not recipe:
+            raise HTTPException(status_code=404, detail="Рецепт не найден")
+        data = (await serialize_recipes(db, [recipe]))[0]
+        return data, content_etag(data)
+
+    data, etag = await _cached(db, f"recipe:{recipe_id}", load, [recipe_tag(recipe_id)])
+    return data, etag
+
+
+async def get_recipes_by_ids(db: AsyncSession, recipe_ids: List[int]):
+    """See crud.get_recipes_by_ids."""
+    recipes = (
+        (await db.execute(select(Recipe).where(Recipe.id.in_(set(recipe_ids))))).scalars().all() if recipe_ids else []
+    )
+    return _recipes_in_order(recipe_ids, await serialize_recipes(db, recipes))
+
+
+# ---------- REVIEWS ----------
+
+async def get_reviews_page(
+    db: AsyncSession, recipe_id: int, limit: Optional[int] = None, cursor: Optional[str] = None, skip: int = 0
+):
+    reviews = (await db.execute(_reviews_page_stmt(recipe_id, limit, cursor, skip))).scalars().all()
+    return reviews, _time_next_cursor(reviews, limit)
+
+
+async def get_reviews_version(db: AsyncSession, recipe_id: int) -> str:
+    count, last_id = (await db.execute(_reviews_version_stmt(recipe_id))).one()
+    return f"{count}:{last_id}"
+
+
+# ---------- COLLECTIONS ----------
+
+async def list_collections(
+    db: AsyncSession, user_id: Optional[int] = None, viewer_id: Optional[int] = None,
+    limit: int = 20, cursor: Optional[str] = None,
+):
+    """See crud.list_collections."""
+    collections = (await db.execute(
+        _collections_page_stmt(_visible_collections(user_id, viewer_id), limit, cursor)
+    )).scalars().all()
+    if not collections:
+        return [], None
+    ids = [c.id for c in collections]
+    card_rows = (await db.execute(_collection_cards_stmt(ids, COLLECTION_PREVIEW_SIZE))).all()
+    counts = (await db.execute(_collection_counts_stmt(ids))).all()
+    return (
+        _collection_payload(collections, card_rows, counts, COLLECTION_PREVIEW_SIZE),
+        _collections_next_cursor(collections, limit),
+    )
+
+
+async def get_collection(
+    db: AsyncSession, collection_id: int, viewer_id: Optional[int] = None, limit: int = 20,
+    cursor: Optional[str] = None,
+):
+    """See crud.get_collection."""
+    collection = _get_visible_collection(await db.get(Collection, collection_id), viewer_id)
+    card_rows = (await db.execute(_collection_cards_stmt([collection_id], limit, cursor))).all()
+    counts = (await db.execute(_collection_counts_stmt([collection_id]))).all()
+    data = _collection_payload([collection], card_rows, counts, limit)[0]
+    return data, data.pop("next_cursor")
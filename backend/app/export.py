@@ -0,0 +1,69 @@
+# backend/app/export.py
+"""Streaming export of the whole recipe catalogue as NDJSON or CSV."""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+from cache import json_default
+from crud import iter_recipe_batches
+from database import ReadSessionLocal
+
+EXPORT_BATCH_SIZE = 1000
+
+CSV_COLUMNS = [
+    "id", "author_id", "title", "description", "cook_time", "category", "diet", "cuisine",
+    "image", "rating_avg", "created_at", "steps", "ingredients",
+]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _batches(batch_size: int):
+    # The export owns its session: the response body is produced after the request's
+    # dependencies (and their sessions) may already have been closed. Read-only, so it
+    # runs on a replica when one is configured.
+    db = ReadSessionLocal()
+    try:
+        yield from iter_recipe_batches(db, batch_size=batch_size)
+    finally:
+        db.close()
+
+
+def iter_ndjson(batch_size: int = EXPORT_BATCH_SIZE):
+    """One RecipeResponse-shaped JSON object per line, one chunk per batch."""
+    for batch in _batches(batch_size):
+        yield "".join(json.dumps(r, ensure_ascii=False, default=json_default) + "\n" for r in batch)
+
+
+def _csv_cell(column: str, value):
+    if column in ("steps", "ingredients"):
+        return json.dumps(value, ensure_ascii=False, default=json_default)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(batch_size: int = EXPORT_BATCH_SIZE):
+    """CSV with a header row; `steps` and `ingredients` are JSON-encoded cells."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for batch in _batches(batch_size):
+        for r in batch:
+            writer.writerow([_csv_cell(col, r[col]) for col in CSV_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+EXPORTERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}
@@ -0,0 +1,392 @@
+# backend/app/ingredient_index.py
+"""In-memory inverted index for "cook with what I have" queries.
+
+For every ingredient the index keeps the recipes using it, either as a sorted array of
+recipe ids (rare ingredients) or as a bitmap held in a Python int (common ones; whichever
+is smaller). Recipe sizes (number of distinct ingredients) are stored bit-sliced: plane j is
+a bitmap of the recipes whose size has bit j set. A query adds the bitmaps of the given
+ingredients into bit-sliced match counts and compares them with the sizes, so finding the
+recipes that miss exactly k ingredients is a few dozen big-int operations over the whole
+catalogue instead of a join per recipe.
+
+The same index serves ingredient autocomplete: normalized names are kept in a sorted list,
+so the names with a given prefix are one bisect away, ranked by how many recipes use them.
+
+The index is built from the database in a background thread, updated after commits that
+create or delete recipes in this process (see crud.py), and catches up with other workers'
+new recipes by id; a periodic rebuild picks up everything else.
+"""
+
+import bisect
+import heapq
+import logging
+import os
+import threading
+import time
+import unicodedata
+from array import array
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+logger = logging.getLogger("cookbook.ingredient_index")
+
+# new recipes written by other workers are fetched at most this often
+SYNC_INTERVAL = float(os.getenv("INGREDIENT_INDEX_SYNC_SECONDS", "5"))
+# full rebuild (deletions by other workers, compaction of arrays into bitmaps)
+REBUILD_INTERVAL = float(os.getenv("INGREDIENT_INDEX_REBUILD_SECONDS", "900"))
+# autocomplete ranks up to this many names per prefix on every call; wider prefixes are cached
+PREFIX_SCAN_LIMIT = 20000
+PREFIX_CACHE_SECONDS = 60
+
+
+def normalize_name(name: str) -> str:
+    """Case- and Unicode-insensitive form of an ingredient name ("Яйца " -> "яйца", "Ёж" -> "еж")."""
+    name = unicodedata.normalize("NFKC", name).casefold().replace("ё", "е")
+    return " ".join(name.split())
+
+
+def _bitmap(recipe_ids) -> int:
+    if not recipe_ids:
+        return 0
+    buf = bytearray(max(recipe_ids) // 8 + 1)
+    for r in recipe_ids:
+        buf[r >> 3] |= 1 << (r & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _highest_bits(bits: int, n: int) -> list:
+    """Positions of the `n` highest set bits, descending (newest recipes first)."""
+    out = []
+    while bits and len(out) < n:
+        top = bits.bit_length() - 1
+        out.append(top)
+        bits ^= 1 << top
+    return out
+
+
+def _add_sliced(a: list, b: list) -> list:
+    """Bit-sliced addition: every bit position is an independent binary number."""
+    out, carry = [], 0
+    for j in range(max(len(a), len(b))):
+        x = a[j] if j < len(a) else 0
+        y = b[j] if j < len(b) else 0
+        out.append(x ^ y ^ carry)
+        carry = (x & y) | (carry & (x ^ y))
+    if carry:
+        out.append(carry)
+    return out
+
+
+def _equal_sliced(a: list, b: list, domain: int) -> int:
+    """Bitmap of the positions in `domain` where the bit-sliced numbers `a` and `b` are equal."""
+    eq = domain
+    for j in range(max(len(a), len(b))):
+        x = a[j] if j < len(a) else 0
+        y = b[j] if j < len(b) else 0
+        eq &= ~(x ^ y)
+        if not eq:
+            break
+    return eq
+
+
+class IngredientIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._building = False
+        self._syncing = False
+        self.postings = {}     # ingredient id -> array('I') of recipe ids, ascending
+        self.bitmaps = {}      # ingredient id -> bitmap of recipe ids
+        self.size_planes = []  # bit-sliced distinct-ingredient counts per recipe
+        self.alive = 0         # bitmap of indexed recipes
+        self.names = {}        # normalize_name(name) -> {ingredient ids}
+        self.labels = {}       # ingredient id -> name as stored
+        self.usage = {}        # ingredient id -> number of recipes using it
+        self.key_usage = {}    # key of `names` -> number of recipes using any of its ids
+        self.prefix_keys = []  # sorted keys of `names`, for prefix lookups
+        self._top = {}         # prefix -> (expires at, suggestions), for prefixes matching many names
+        self.max_recipe_id = 0
+        self.built_at = 0.0
+        self.synced_at = 0.0
+
+    # ---------- BUILD ----------
+
+    def start(self):
+        """(Re)build in a background thread unless a build is already running."""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._build_logged, name="ingredient-index", daemon=True).start()
+
+    def start_sync(self):
+        """Run sync() every SYNC_INTERVAL in a background thread (once per process).
+
+        Autocomplete never calls sync() itself, so without this a worker that serves no
+        /match requests would keep its startup snapshot of other workers' recipes.
+        """
+        with self._lock:
+            if self._syncing:
+                return
+            self._syncing = True
+        threading.Thread(target=self._sync_loop, name="ingredient-index-sync", daemon=True).start()
+
+    def _sync_loop(self):
+        while True:
+            time.sleep(SYNC_INTERVAL)
+            if not self._ready.is_set():
+                continue
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("ingredient index sync failed")
+
+    def wait_ready(self, timeout: float) -> bool:
+        if not self._ready.is_set():
+            self.start()
+        return self._ready.wait(timeout)
+
+    def _build_logged(self):
+        try:
+            started = time.monotonic()
+            self.build()
+            logger.info("ingredient index built: %d recipes, %d ingredients in %.1fs",
+                        bin(self.alive).count("1"), len(self.names), time.monotonic() - started)
+        except Exception:
+            logger.exception("ingredient index build failed")
+        finally:
+            with self._lock:
+                self._building = False
+
+    def build(self):
+        db = SessionLocal()
+        try:
+            # ids first: anything committed after this is fetched by sync()
+            max_id = db.execute(text("SELECT coalesce(max(id), 0) FROM recipes")).scalar()
+            sizes = db.execute(text(
+                "SELECT recipe_id, count(DISTINCT ingredient_id) FROM recipe_ingredients "
+                "WHERE recipe_id <= :max GROUP BY recipe_id"
+            ), {"max": max_id}).all()
+            lists = db.execute(text(
+                "SELECT ingredient_id, array_agg(DISTINCT recipe_id ORDER BY recipe_id) FROM recipe_ingredients "
+                "WHERE recipe_id <= :max GROUP BY ingredient_id"
+            ), {"max": max_id}).all()
+            names = db.execute(text("SELECT id, name FROM ingredients")).all()
+        finally:
+            db.close()
+
+        postings, bitmaps, usage = {}, {}, {}
+        for ingredient_id, recipe_ids in lists:
+            usage[ingredient_id] = len(recipe_ids)
+            if len(recipe_ids) * 32 > max_id:
+                bitmaps[ingredient_id] = _bitmap(recipe_ids)
+            else:
+                postings[ingredient_id] = array("I", recipe_ids)
+        plane_ids = {}
+        for recipe_id, size in sizes:
+            j = 0
+            while size:
+                if size & 1:
+                    plane_ids.setdefault(j, []).append(recipe_id)
+                size >>= 1
+                j += 1
+        planes = [_bitmap(plane_ids.get(j, ())) for j in range(max(plane_ids, default=-1) + 1)]
+        name_map = {}
+        for ingredient_id, name in names:
+            name_map.setdefault(normalize_name(name), set()).add(ingredient_id)
+
+        with self._lock:
+            self.postings, self.bitmaps, self.size_planes = postings, bitmaps, planes
+            self.alive = _bitmap([recipe_id for recipe_id, _ in sizes])
+            self.names, self.labels, self.usage = name_map, dict(names), usage
+            self.key_usage = {key: sum(usage.get(i, 0) for i in ids) for key, ids in name_map.items()}
+            self.prefix_keys, self._top = sorted(name_map), {}
+            self.max_recipe_id = max_id
+            self.built_at = self.synced_at = time.monotonic()
+        self._ready.set()
+
+    # ---------- UPDATES ----------
+
+    def add_recipes(self, recipes: dict, names: dict = None):
+        """Index recipes: ``recipe id -> ingredient ids``; `names` adds ``name -> id`` pairs.
+
+        Idempotent, so a recipe seen both through a commit hook and a sync is counted once.
+        """
+        if not self._ready.is_set():
+            return
+        with self._lock:
+            for name, ingredient_id in (names or {}).items():
+                key = normalize_name(name)
+                if key not in self.names:
+                    self.names[key] = set()
+                    bisect.insort(self.prefix_keys, key)
+                self.names[key].add(ingredient_id)
+                self.labels[ingredient_id] = name
+            new = {r: set(ids) for r, ids in recipes.items() if ids and not (self.alive >> r) & 1}
+            if not new:
+                return
+            per_ingredient = {}
+            for recipe_id, ids in new.items():
+                for ingredient_id in ids:
+                    per_ingredient.setdefault(ingredient_id, []).append(recipe_id)
+            for ingredient_id, recipe_ids in per_ingredient.items():
+                self.usage[ingredient_id] = self.usage.get(ingredient_id, 0) + len(recipe_ids)
+                if ingredient_id in self.labels:
+                    key = normalize_name(self.labels[ingredient_id])
+                    self.key_usage[key] = self.key_usage.get(key, 0) + len(recipe_ids)
+                recipe_ids.sort()
+                if ingredient_id in self.bitmaps:
+                    self.bitmaps[ingredient_id] |= _bitmap(recipe_ids)
+                    continue
+                posting = self.postings.setdefault(ingredient_id, array("I"))
+                if not posting or recipe_ids[0] > posting[-1]:
+                    posting.extend(recipe_ids)
+                else:
+                    for r in recipe_ids:
+                        bisect.insort(posting, r)
+            sizes = [(r, len(ids)) for r, ids in new.items()]
+            for j in range(max(size for _, size in sizes).bit_length()):
+                if j == len(self.size_planes):
+                    self.size_planes.append(0)
+                self.size_planes[j] |= _bitmap([r for r, size in sizes if (size >> j) & 1])
+            self.alive |= _bitmap(list(new))
+            self.max_recipe_id = max(self.max_recipe_id, *new)
+
+    def remove_recipes(self, recipe_ids):
+        if not self._ready.is_set():
+            return
+        with self._lock:
+            # postings keep the stale ids; everything is filtered through `alive`
+            self.alive &= ~_bitmap(list(recipe_ids))
+
+    def sync(self):
+        """Pick up recipes created by other workers since the last build/sync (by id)."""
+        now = time.monotonic()
+        if now - self.built_at > REBUILD_INTERVAL:
+            self.built_at = now  # one rebuild at a time
+            self.start()
+        if now - self.synced_at < SYNC_INTERVAL:
+            return
+        self.synced_at = now
+        db = SessionLocal()
+        try:
+            rows = db.execute(text(
+                "SELECT recipe_id, ingredient_id FROM recipe_ingredients WHERE recipe_id > :max"
+            ), {"max": self.max_recipe_id}).all()
+            names = dict(
+                (name, ingredient_id) for ingredient_id, name in db.execute(text(
+                    "SELECT id, name FROM ingredients WHERE id = ANY(:ids)"
+                ), {"ids": list({ingredient_id for _, ingredient_id in rows})}).all()
+            ) if rows else {}
+        finally:
+            db.close()
+        recipes = {}
+        for recipe_id, ingredient_id in rows:
+            recipes.setdefault(recipe_id, set()).add(ingredient_id)
+        self.add_recipes(recipes, names)
+
+    # ---------- QUERIES ----------
+
+    def resolve(self, names) -> dict:
+        """``name -> {ingredient ids}`` for the names known to the index (all spellings of a name)."""
+        return {name: self.names[normalize_name(name)] for name in names if normalize_name(name) in self.names}
+
+    def _label(self, key: str) -> str:
+        # the most used of the spellings sharing this key
+        best = max(self.names[key], key=lambda i: (self.usage.get(i, 0), -i))
+        return self.labels.get(best, key)
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> list:
+        """Ingredient names starting with `prefix` (normalized), most used first.
+
+        Each item is ``{"name", "count"}``; `count` is the number of recipes using the name.
+        """
+        prefix = normalize_name(prefix)
+        with self._lock:
+            keys, key_usage = self.prefix_keys, self.key_usage
+            lo = bisect.bisect_left(keys, prefix)
+            hi = bisect.bisect_left(keys, prefix + "\U0010ffff", lo)
+            cached = self._top.get(prefix)
+            if cached and cached[0] > time.monotonic() and len(cached[1]) >= limit:
+                return cached[1][:limit]
+            best = heapq.nsmallest(
+                max(limit, 20) if hi - lo > PREFIX_SCAN_LIMIT else limit,
+                keys[lo:hi],
+                key=lambda k: (-key_usage.get(k, 0), k),
+            )
+            result = [{"name": self._label(k), "count": key_usage.get(k, 0)} for k in best]
+            if hi - lo > PREFIX_SCAN_LIMIT:
+                # short prefixes of a big catalogue: ranked once, then served from here for a while
+                self._top[prefix] = (time.monotonic() + PREFIX_CACHE_SECONDS, result)
+            return result[:limit]
+
+    def _recipes_with(self, ingredient_id: int) -> int:
+        bitmap = self.bitmaps.get(ingredient_id)
+        if bitmap is not None:
+            return bitmap
+        return _bitmap(self.postings.get(ingredient_id, ()))
+
+    def match(self, ingredient_ids, max_missing: int = 2, limit: int = 20) -> list:
+        """``[(recipe id, missing)]``: recipes using any of `ingredient_ids`, fewest missing first.
+
+        Within the same number of missing ingredients the newest recipes come first.
+        """
+        with self._lock:
+            bitmaps = [self._recipes_with(i) for i in set(ingredient_ids)]
+            planes, alive = list(self.size_planes), self.alive
+        domain = 0
+        for bitmap in bitmaps:
+            domain |= bitmap
+        domain &= alive
+        if not domain:
+            return []
+        counts = []
+        for bitmap in bitmaps:
+            counts = _add_sliced(counts, [bitmap & domain])
+        results = []
+        for missing in range(max_missing + 1):
+            constant = [domain if (missing >> j) & 1 else 0 for j in range(missing.bit_length())]
+            needed = _add_sliced(counts, constant)
+            for recipe_id in _highest_bits(_equal_sliced(planes, needed, domain), limit - len(results)):
+                results.append((recipe_id, missing))
+            if len(results) >= limit:
+                break
+        return results
+
+
+ingredient_index = IngredientIndex()
+
+
+# Recipe writes are recorded on the session and applied to the index once committed
+# (see crud.create_recipe / create_recipes_bulk / delete_recipe); a rollback drops them.
+
+def record_recipes(db: Session, recipes: dict, names: dict):
+    """Queue ``recipe id -> ingredient ids`` (and the ``name -> id`` pairs used) for indexing."""
+    pending = db.info.setdefault("indexed_recipes", ({}, {}))
+    pending[0].update(recipes)
+    pending[1].update(names)
+
+
+def record_deleted_recipe(db: Session, recipe_id: int):
+    db.info.setdefault("unindexed_recipes", set()).add(recipe_id)
+
+
+def _apply_recorded(session):
+    recipes, names = session.info.pop("indexed_recipes", ({}, {}))
+    if recipes:
+        ingredient_index.add_recipes(recipes, names)
+    removed = session.info.pop("unindexed_recipes", None)
+    if removed:
+        ingredient_index.remove_recipes(removed)
+
+
+def _drop_recorded(session):
+    session.info.pop("indexed_recipes", None)
+    session.info.pop("unindexed_recipes", None)
+
+
+event.listen(Session, "after_commit", _apply_recorded)
+event.listen(Session, "after_rollback", _drop_recorded)
@@ -0,0 +1,160 @@
+# backend/app/instrumentation.py
+"""Per-request SQL accounting, slow-query logging and Prometheus-style metrics.
+
+Engine events time every statement and attribute it to the request being served (through a
+context variable, which also reaches sync endpoints running in the threadpool). The HTTP
+middleware turns that into `Server-Timing`/`X-DB-Query-Count` headers, a JSON log line per
+request and counters exported by `/metrics`.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+from starlette.requests import Request
+
+logger = logging.getLogger("cookbook.request")
+sql_logger = logging.getLogger("cookbook.sql")
+
+# statements slower than this are logged with their parameters; 0 disables the log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# how many of the slowest statements are kept per request for the request log
+SLOWEST_KEPT = 3
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "slowest")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest = []  # [(seconds, statement)], longest first
+
+    def record(self, statement: str, seconds: float):
+        self.queries += 1
+        self.db_time += seconds
+        if len(self.slowest) < SLOWEST_KEPT or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+# ---------- ENGINE HOOKS ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        sql_logger.warning(json.dumps({
+            "event": "slow_query",
+            "ms": round(seconds * 1000, 2),
+            "statement": statement,
+            "parameters": repr(parameters)[:500],
+            "executemany": executemany,
+        }, ensure_ascii=False))
+
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---------- METRICS ----------
+
+class Metrics:
+    """Per-route counters rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)        # (method, route, status) -> count
+        self.duration_sum = defaultdict(float)  # (method, route) -> seconds
+        self.duration_buckets = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+        self.duration_count = defaultdict(int)
+        self.db_queries = defaultdict(int)
+        self.db_time = defaultdict(float)
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, status)] += 1
+            self.duration_sum[key] += seconds
+            self.duration_count[key] += 1
+            buckets = self.duration_buckets[key]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+            self.db_queries[key] += stats.queries
+            self.db_time[key] += stats.db_time
+
+    def render(self, extra: dict = None) -> str:
+        lines = [
+            "# TYPE cookbook_http_requests_total counter",
+            "# TYPE cookbook_http_request_duration_seconds histogram",
+            "# TYPE cookbook_db_queries_total counter",
+            "# TYPE cookbook_db_time_seconds_total counter",
+        ]
+        with self._lock:
+            for (method, route, status), n in sorted(self.requests.items()):
+                lines.append(f'cookbook_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {n}')
+            for (method, route), total in sorted(self.duration_count.items()):
+                labels = f'method="{method}",route="{route}"'
+                for bound, n in zip(DURATION_BUCKETS, self.duration_buckets[(method, route)]):
+                    lines.append(f'cookbook_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {n}')
+                lines.append(f'cookbook_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {total}')
+                lines.append(f"cookbook_http_request_duration_seconds_sum{{{labels}}} {self.duration_sum[(method, route)]:.6f}")
+                lines.append(f"cookbook_http_request_duration_seconds_count{{{labels}}} {total}")
+                lines.append(f"cookbook_db_queries_total{{{labels}}} {self.db_queries[(method, route)]}")
+                lines.append(f"cookbook_db_time_seconds_total{{{labels}}} {self.db_time[(method, route)]:.6f}")
+        for name, value in (extra or {}).items():
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+# ---------- MIDDLEWARE ----------
+
+async def instrumentation_middleware(request: Request, call_next):
+    stats = RequestStats()
+    token = _current.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    elapsed = time.perf_counter() - started
+
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    metrics.observe(request.method, route, response.status_code, elapsed, stats)
+    response.headers["Server-Timing"] = (
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries", app;dur={elapsed * 1000:.2f}'
+    )
+    response.headers["X-DB-Query-Count"] = str(stats.queries)
+    logger.info(json.dumps({
+        "event": "request",
+        "method": request.method,
+        "route": route,
+        "path": request.url.path,
+        "status": response.status_code,
+        "ms": round(elapsed * 1000, 2),
+        "db_queries": stats.queries,
+        "db_ms": round(stats.db_time * 1000, 2),
+        "slowest": [{"ms": round(s * 1000, 2), "statement": sql[:200]} for s, sql in stats.slowest],
+    }, ensure_ascii=False))
+    return response
@@ -1,12 +1,16 @@
-from fastapi import FastAPI, HTTPException, status, Depends, Body, UploadFile, File, Form
-from typing import List
+from fastapi import FastAPI, HTTPException, status, Depends, Body, UploadFile, File, Form, Response, Header
+from typing import List, Optional
 from sqlalchemy.orm import Session
-from database import init_db, get_db
-from auth import authenticate_user, create_access_token
-from auth import get_current_user, oauth2_scheme
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import init_db, get_db, get_async_db, get_async_primary_db, pool_stats, ENGINES
+from auth import authenticate_user, create_access_token, hash_password
+from auth import get_current_user, get_optional_user, oauth2_scheme
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse, PlainTextResponse
+import io
+import logging
 import os
-import uuid
+from datetime import timedelta
 import json
 from schemas import (
     UserLogin,
@@ -15,52 +19,266 @@ from schemas import (
     UserResponse,
     RecipeCreate,
     RecipeResponse,
+    RecipeFilterResponse,
+    RecipeBatchResponse,
+    RecipeMatchResponse,
+    IngredientSuggestion,
     ReviewCreate,
     ReviewResponse,
     CollectionCreate,
     CollectionResponse,
+    CollectionDetail,
+    CollectionSummary,
+    CollectionRecipesAdd,
     ShoppingListCreate,
+    ShoppingListGenerate,
     ShoppingListResponse,
 )
 from crud import (
-    create_user,
     create_recipe,
-    search_recipes,
-    get_all_recipes,
-    get_recipe_by_id,
     delete_recipe,
+    match_recipes,
     create_review,
-    get_reviews_for_recipe,
+    delete_review,
+    RECIPE_SORTS,
     create_collection,
     add_recipe_to_collection,
+    add_recipes_to_collection,
     create_shopping_list,
+    generate_shopping_list,
     get_user_shopping_lists,
-    get_user_by_id,
 )
-from database import Collection
+import crud_async
+from database import Collection, COOK_TIME_BUCKETS
+from bulk_import import import_recipes, DEFAULT_BATCH_SIZE
+from export import EXPORTERS, MEDIA_TYPES
+from instrumentation import instrument_engine, instrumentation_middleware, metrics
+from cache import recipe_cache, content_etag
+from storage import save_image, STATIC_DIR, UploadSizeLimitMiddleware, MAX_UPLOAD_BYTES
+from thumbnails import schedule_image_processing
+from ingredient_index import ingredient_index
 
 app = FastAPI(title="CookBook API")
 
+# SQL query counting / slow-query log per request (Server-Timing, X-DB-Query-Count, /metrics)
+for _engine in ENGINES.values():
+    instrument_engine(_engine)
+app.middleware("http")(instrumentation_middleware)
+# upload bodies are capped before Starlette spools them to disk (save_image checks the image again)
+app.add_middleware(UploadSizeLimitMiddleware, paths=["/api/recipes/upload"], max_bytes=MAX_UPLOAD_BYTES)
+
 # mount static directory so images are served at /static/
-static_dir = os.path.join(os.path.dirname(__file__), '..', 'static')
-os.makedirs(os.path.join(static_dir, 'images'), exist_ok=True)
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
+
+@app.on_event("startup")
+def build_ingredient_index():
+    # built in the background; /api/recipes/match answers 503 until it is ready
+    ingredient_index.start()
+    # picks up other workers' recipes (and rebuilds periodically) whatever this worker serves
+    ingredient_index.start_sync()
+
+
+# Keyset pagination: the cursor for the next page is returned in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Bounds of /api/recipes/match and /api/ingredients/autocomplete parameters
+MAX_MATCH_MISSING = 10
+MAX_MATCH_LIMIT = 100
+MAX_SUGGESTIONS = 50
+# recipes per bulk add to a collection
+MAX_COLLECTION_BULK = 500
+# ids per GET /api/recipes?ids=
+MAX_BATCH_IDS = 100
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
-@app.get("/api/recipes")
-async def read_recipes():
-    return {"message": "CookBook API is running"}
+
+# HTTP caching of read endpoints: browsers reuse responses for max-age, then revalidate by ETag
+LIST_CACHE_CONTROL = "public, max-age=15"
+DETAIL_CACHE_CONTROL = "public, max-age=60"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    # weak comparison is what If-None-Match uses, so W/"x" matches "x"
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def conditional_response(response: Response, if_none_match: Optional[str], etag: str, cache_control: str):
+    """Attach ETag/Cache-Control; return a 304 response when the client's copy is current."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+@app.get(
+    "/api/recipes",
+    tags=["Recipes"],
+    summary="Get many recipes by id",
+    responses={200: {"model": RecipeBatchResponse}},
+)
+async def read_recipes(
+    response: Response,
+    ids: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Recipes for the comma-separated `ids` (at most MAX_BATCH_IDS), in the order given.
+
+    Unknown ids get null in `items` and are listed in `not_found`. Without `ids` this is
+    the API status check it always was.
+    """
+    if ids is None:
+        return {"message": "CookBook API is running"}
+    try:
+        recipe_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if len(recipe_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    items, not_found = await crud_async.get_recipes_by_ids(db, recipe_ids)
+    data = {"items": items, "not_found": not_found}
+    not_modified = conditional_response(response, if_none_match, content_etag(data), LIST_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return RecipeBatchResponse(**data)
+
+
+@app.get("/api/cache/stats", tags=["Service"], summary="Recipe cache counters")
+def cache_stats():
+    return {"recipes": recipe_cache.stats()}
+
+
+@app.get("/metrics", tags=["Service"], summary="Prometheus metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    cache = recipe_cache.stats()
+    extra = {
+        "cookbook_recipe_cache_hits_total": cache["hits"],
+        "cookbook_recipe_cache_misses_total": cache["misses"],
+    }
+    for name, pool in pool_stats().items():
+        for key, value in pool.items():
+            extra[f'cookbook_db_pool_{key}{{engine="{name}"}}'] = value
+    return metrics.render(extra)
 
 
 @app.get("/api/recipes/all", response_model=List[RecipeResponse], tags=["Recipes"], summary="List recipes (paginated)")
-def list_recipes(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
-    """Return a paginated list of recipes"""
-    return get_all_recipes(db, skip=skip, limit=limit)
+async def list_recipes(
+    response: Response,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    sort: str = "new",
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Return a paginated list of recipes, newest first (`sort=new`) or best rated first (`sort=rating`).
+
+    Pass the X-Next-Cursor header of the previous page as `cursor` to page by keyset; `skip` is ignored then.
+    """
+    if sort not in RECIPE_SORTS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort, use one of: {', '.join(RECIPE_SORTS)}")
+    items, next_cursor, etag = await crud_async.get_recipes_page(db, limit=limit, cursor=cursor, skip=skip, sort=sort)
+    set_next_cursor(response, next_cursor)
+    not_modified = conditional_response(response, if_none_match, etag, LIST_CACHE_CONTROL)
+    if not_modified:
+        set_next_cursor(not_modified, next_cursor)
+        return not_modified
+    return items
+
+
+@app.get("/api/recipes/filter", response_model=RecipeFilterResponse, tags=["Recipes"], summary="Filter recipes with facet counts")
+async def filter_recipes_endpoint(
+    response: Response,
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    cuisine: Optional[str] = None,
+    diet: Optional[str] = None,
+    cook_time: Optional[str] = None,
+    sort: str = "new",
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Recipes matching the filters (and `q`, as in /api/recipes/search) plus counts per facet value.
+
+    `cook_time` is a bucket key from the `cook_time` facet, e.g. "15-30". Paging by `cursor`
+    works as in /api/recipes/all.
+    """
+    if cook_time and cook_time not in COOK_TIME_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Unsupported cook_time, use one of: {', '.join(COOK_TIME_BUCKETS)}")
+    if sort not in RECIPE_SORTS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort, use one of: {', '.join(RECIPE_SORTS)}")
+    filters = {"category": category, "cuisine": cuisine, "diet": diet, "cook_time": cook_time}
+    data, next_cursor, etag = await crud_async.filter_recipes_page(
+        db, q=q, filters=filters, limit=limit, cursor=cursor, sort=sort
+    )
+    set_next_cursor(response, next_cursor)
+    not_modified = conditional_response(response, if_none_match, etag, LIST_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    return data
+
+
+@app.get("/api/recipes/match", response_model=List[RecipeMatchResponse], tags=["Recipes"], summary="Recipes cookable from given ingredients")
+def match_recipes_endpoint(
+    ingredients: str,
+    max_missing: int = 2,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+):
+    """Recipes using the comma-separated `ingredients`, fewest missing ingredients first.
+
+    Names are matched case-insensitively; recipes missing more than `max_missing` ingredients
+    are left out. Within the same number missing, newer recipes come first.
+    """
+    names = [name.strip() for name in ingredients.split(",") if name.strip()]
+    if not names:
+        raise HTTPException(status_code=400, detail="ingredients is empty")
+    if not 0 <= max_missing <= MAX_MATCH_MISSING or not 1 <= limit <= MAX_MATCH_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_missing must be 0..{MAX_MATCH_MISSING}, limit 1..{MAX_MATCH_LIMIT}",
+        )
+    if not ingredient_index.wait_ready(timeout=0):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Индекс ингредиентов строится, повторите позже",
+            headers={"Retry-After": "5"},
+        )
+    return match_recipes(db, names, max_missing=max_missing, limit=limit)
 
 
 @app.get("/api/recipes/search", response_model=List[RecipeResponse], tags=["Recipes"], summary="Search recipes")
-def search_recipes_endpoint(q: str, skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
-    """Search recipes by query string across title/description/category/cuisine and ingredients."""
-    return search_recipes(db, q=q, skip=skip, limit=limit)
+async def search_recipes_endpoint(
+    response: Response,
+    q: str,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Search recipes by query string across title/description/category/cuisine and ingredients.
+
+    Results are ordered by relevance; paging by `cursor` works as in /api/recipes/all.
+    """
+    items, next_cursor, etag = await crud_async.search_recipes_page(db, q=q, limit=limit, cursor=cursor, skip=skip)
+    set_next_cursor(response, next_cursor)
+    not_modified = conditional_response(response, if_none_match, etag, LIST_CACHE_CONTROL)
+    if not_modified:
+        set_next_cursor(not_modified, next_cursor)
+        return not_modified
+    return items
 
 
 @app.post("/api/recipes", response_model=RecipeResponse, tags=["Recipes"], summary="Create recipe (JSON)")
@@ -85,24 +303,62 @@ def upload_recipe(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid recipe JSON: {e}")
 
-    # handle image if provided
+    # handle image if provided: streamed to storage, named by content hash
+    if image:
+        recipe_obj.image = save_image(image.file, image.filename)
+
+    created = create_recipe(db, recipe_obj, current_user.id)
     if image:
-        ext = os.path.splitext(image.filename)[1] or ".jpg"
-        filename = f"{uuid.uuid4().hex}{ext}"
-        images_dir = os.path.join(os.path.dirname(__file__), '..', 'static', 'images')
-        os.makedirs(images_dir, exist_ok=True)
-        dest_path = os.path.join(images_dir, filename)
-        with open(dest_path, "wb") as f:
-            f.write(image.file.read())
-        # store path accessible by client
-        recipe_obj.image = f"/static/images/{filename}"
+        # thumbnails and the placeholder are made in the background; the upload returns now
+        schedule_image_processing(recipe_obj.image)
+    return created
+
+
+@app.get("/api/recipes/export", tags=["Recipes"], summary="Export all recipes (NDJSON or CSV stream)")
+def export_recipes(format: str = "ndjson"):
+    """Stream every recipe with ingredients and steps; `format` is "ndjson" or "csv".
+
+    Public on purpose, unlike import: it returns only what /api/recipes/all already serves to
+    anyone (RecipeResponse fields), and reads from a replica. Import writes recipes in the
+    caller's name, so it needs a token.
+    """
+    if format not in EXPORTERS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format, use one of: {', '.join(EXPORTERS)}")
+    return StreamingResponse(
+        EXPORTERS[format](),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="recipes.{format}"'},
+    )
+
+
+@app.post("/api/recipes/import", tags=["Recipes"], summary="Bulk import recipes (NDJSON or JSON array)")
+def import_recipes_endpoint(
+    file: UploadFile = File(...),
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """Import many RecipeCreate objects authored by the current user.
 
-    return create_recipe(db, recipe_obj, current_user.id)
+    The upload is parsed and written in batches of `batch_size`; the response reports
+    per-batch errors and throughput.
+    """
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive")
+    # utf-8-sig: files saved by Windows editors start with a BOM
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig")
+    return import_recipes(db, stream, current_user.id, batch_size=batch_size)
 
 
 @app.get("/api/recipes/{recipe_id}", response_model=RecipeResponse, tags=["Recipes"], summary="Get recipe by id")
-def get_recipe(recipe_id: int, db: Session = Depends(get_db)):
-    return get_recipe_by_id(db, recipe_id)
+async def get_recipe(
+    recipe_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    data, etag = await crud_async.get_recipe_entry(db, recipe_id)
+    return conditional_response(response, if_none_match, etag, DETAIL_CACHE_CONTROL) or data
 
 
 @app.delete("/api/recipes/{recipe_id}", tags=["Recipes"], summary="Delete recipe (owner only)")
@@ -116,9 +372,48 @@ def post_review(recipe_id: int, review: ReviewCreate, db: Session = Depends(get_
     return create_review(db, recipe_id, current_user.id, review)
 
 
+@app.delete("/api/recipes/{recipe_id}/reviews", tags=["Reviews"], summary="Delete own review of a recipe")
+def remove_review(recipe_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    return delete_review(db, recipe_id, current_user.id)
+
+
 @app.get("/api/recipes/{recipe_id}/reviews", response_model=List[ReviewResponse], tags=["Reviews"], summary="List reviews for a recipe")
-def list_reviews(recipe_id: int, db: Session = Depends(get_db)):
-    return get_reviews_for_recipe(db, recipe_id)
+async def list_reviews(
+    recipe_id: int,
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Reviews, newest first. Without `limit` all reviews are returned."""
+    # validated before the reviews themselves are loaded
+    etag = content_etag([recipe_id, limit, cursor, await crud_async.get_reviews_version(db, recipe_id)])
+    not_modified = conditional_response(response, if_none_match, etag, LIST_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    items, next_cursor = await crud_async.get_reviews_page(db, recipe_id, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return items
+
+
+@app.get("/api/ingredients/autocomplete", response_model=List[IngredientSuggestion], tags=["Ingredients"], summary="Ingredient name suggestions")
+async def autocomplete_ingredients(q: str, limit: int = 10):
+    """Ingredient names starting with `q`, ignoring case, ё/е and extra spaces; most used first.
+
+    Served from the in-memory ingredient index, no database query.
+    """
+    if not 1 <= limit <= MAX_SUGGESTIONS:
+        raise HTTPException(status_code=400, detail=f"limit must be 1..{MAX_SUGGESTIONS}")
+    if not q.strip():
+        return []
+    if not ingredient_index.wait_ready(timeout=0):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Индекс ингредиентов строится, повторите позже",
+            headers={"Retry-After": "5"},
+        )
+    return ingredient_index.autocomplete(q, limit=limit)
 
 
 @app.post("/api/collections", response_model=CollectionResponse, tags=["Collections"], summary="Create collection (authenticated)")
@@ -126,37 +421,119 @@ def create_collection_endpoint(collection: CollectionCreate, db: Session = Depen
     return create_collection(db, current_user.id, collection)
 
 
-@app.post("/api/collections/{collection_id}/recipes", tags=["Collections"], summary="Add recipe to collection (owner only)")
-def add_to_collection(collection_id: int, recipe_id: int = Body(..., embed=True), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    """Add a recipe to a collection. Only collection owner may modify their collection."""
+def owned_collection(db: Session, collection_id: int, user_id: int) -> Collection:
     coll = db.query(Collection).filter(Collection.id == collection_id).first()
     if not coll:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Collection not found")
-    if coll.user_id != current_user.id:
+    if coll.user_id != user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Нет прав на изменение коллекции")
+    return coll
+
+
+@app.post("/api/collections/{collection_id}/recipes", tags=["Collections"], summary="Add recipe to collection (owner only)")
+def add_to_collection(collection_id: int, recipe_id: int = Body(..., embed=True), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """Add a recipe to a collection. Only collection owner may modify their collection.
+
+    Adding a recipe that is already in the collection succeeds and changes nothing.
+    """
+    owned_collection(db, collection_id, current_user.id)
     return add_recipe_to_collection(db, collection_id, recipe_id)
 
 
+@app.post("/api/collections/{collection_id}/recipes/bulk", tags=["Collections"], summary="Add many recipes to collection (owner only)")
+def bulk_add_to_collection(collection_id: int, data: CollectionRecipesAdd, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """Add recipes in one statement. `added` lists the ids added; ids already in the
+    collection or of unknown recipes are skipped."""
+    if len(data.recipe_ids) > MAX_COLLECTION_BULK:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COLLECTION_BULK} recipes per request")
+    owned_collection(db, collection_id, current_user.id)
+    return {"added": add_recipes_to_collection(db, collection_id, data.recipe_ids)}
+
+
+@app.get("/api/collections", response_model=List[CollectionSummary], tags=["Collections"], summary="List public collections")
+async def list_public_collections(
+    response: Response,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Public collections, newest first, each with its recipe count and first recipe cards.
+
+    Paging by `cursor` works as in /api/recipes/all.
+    """
+    items, next_cursor = await crud_async.list_collections(db, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return items
+
+
+@app.get("/api/collections/{collection_id}", response_model=CollectionDetail, tags=["Collections"], summary="Get collection with recipe cards")
+async def read_collection(
+    collection_id: int,
+    response: Response,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_optional_user),
+):
+    """A collection and one page of its recipes (newest added first); the cursor for the next
+    page is in X-Next-Cursor. Private collections are visible to their owner only."""
+    viewer_id = current_user.id if current_user else None
+    data, next_cursor = await crud_async.get_collection(db, collection_id, viewer_id, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return data
+
+
+@app.get("/api/users/{user_id}/collections", response_model=List[CollectionSummary], tags=["Collections"], summary="List user's collections")
+async def user_collections(
+    user_id: int,
+    response: Response,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_optional_user),
+):
+    """The user's collections like /api/collections; private ones are included for the user themselves."""
+    viewer_id = current_user.id if current_user else None
+    items, next_cursor = await crud_async.list_collections(db, user_id, viewer_id, limit=limit, cursor=cursor)
+    set_next_cursor(response, next_cursor)
+    return items
+
+
 @app.post("/api/shopping-lists", response_model=ShoppingListResponse, tags=["ShoppingLists"], summary="Create shopping list (authenticated)")
 def create_shopping_list_endpoint(data: ShoppingListCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
     return create_shopping_list(db, current_user.id, data)
 
 
+@app.post("/api/shopping-lists/generate", response_model=ShoppingListResponse, tags=["ShoppingLists"], summary="Build shopping list from recipes (authenticated)")
+def generate_shopping_list_endpoint(data: ShoppingListGenerate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """Sum the ingredients of `recipes` (each scaled by its `servings`) into a new shopping list.
+
+    Units are normalized (кг/г, л/мл, шт) and the same ingredient is merged across recipes.
+    """
+    return generate_shopping_list(db, current_user.id, data)
+
+
 @app.get("/api/users/{user_id}/shopping-lists", response_model=List[ShoppingListResponse], tags=["ShoppingLists"], summary="Get user's shopping lists")
 def user_shopping_lists(user_id: int, db: Session = Depends(get_db)):
     return get_user_shopping_lists(db, user_id)
 
 
 @app.get("/api/users/{user_id}", response_model=UserResponse, tags=["Users"], summary="Get user by id")
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = get_user_by_id(db, user_id)
+async def get_user(
+    user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    user = await crud_async.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Пользователь не найден")
-    return user
+    etag = content_etag([user.id, user.email, user.username, user.bio, user.avatar, user.is_active, user.date_joined])
+    return conditional_response(response, if_none_match, etag, DETAIL_CACHE_CONTROL) or user
 
 @app.post("/api/auth/token", response_model=Token)
-async def login_for_access_token(user_data: UserLogin):
-    user = authenticate_user(user_data.email, user_data.password)
+async def login_for_access_token(user_data: UserLogin, db: AsyncSession = Depends(get_async_primary_db)):
+    user = await authenticate_user(db, user_data.email, user_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -170,11 +547,12 @@ async def login_for_access_token(user_data: UserLogin):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/api/auth/register", response_model=UserResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    return create_user(db, user_data)
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_primary_db)):
+    return await crud_async.create_user(db, user_data, await hash_password(user_data.password))
 
 if __name__ == "__main__":
     import uvicorn
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(name)s %(levelname)s %(message)s")
     init_db()
     # seed DB with initial data
     try:
@@ -1,5 +1,5 @@
-from typing import List, Optional
-from pydantic import BaseModel, EmailStr
+from typing import Dict, List, Optional
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 
 
@@ -54,6 +54,12 @@ class IngredientResponse(IngredientBase):
         from_attributes = True
 
 
+class IngredientSuggestion(BaseModel):
+    name: str
+    # number of recipes using the name (all its spellings)
+    count: int
+
+
 # ---------- RECIPE ----------
 
 class RecipeStep(BaseModel):
@@ -83,16 +89,50 @@ class RecipeCreate(RecipeBase):
     pass
 
 
+class ImageVariant(BaseModel):
+    width: int
+    webp: str
+    jpeg: str
+
+
+class RecipeImageVariants(BaseModel):
+    placeholder: Optional[str] = None  # data: URI of a tiny blurred preview
+    variants: List[ImageVariant] = []  # ascending width, for srcset
+
+
 class RecipeResponse(RecipeBase):
     id: int
     author_id: int
     rating_avg: float
     created_at: datetime
+    # null until the background worker has processed the uploaded image
+    image_variants: Optional[RecipeImageVariants] = None
 
     class Config:
         from_attributes = True
 
 
+class RecipeMatchResponse(RecipeResponse):
+    # how many of the recipe's ingredients are not among the ones given
+    missing: int
+    missing_ingredients: List[str]
+
+
+class RecipeBatchResponse(BaseModel):
+    # in the order of the requested ids; null where a recipe does not exist
+    items: List[Optional[RecipeResponse]]
+    not_found: List[int]
+
+
+class RecipeFilterResponse(BaseModel):
+    items: List[RecipeResponse]
+    total: int
+    # facet -> value -> number of recipes; each facet ignores its own filter
+    facets: Dict[str, Dict[str, int]]
+    # with q: only the SEARCH_MAX_CANDIDATES most relevant hits were counted (and listed)
+    truncated: bool = False
+
+
 # ---------- REVIEW ----------
 
 class ReviewBase(BaseModel):
@@ -136,6 +176,33 @@ class CollectionResponse(CollectionBase):
         from_attributes = True
 
 
+class RecipeCard(BaseModel):
+    """Lightweight recipe for lists of collections (no steps or ingredients)."""
+    id: int
+    title: str
+    image: Optional[str] = None
+    rating_avg: float
+    cook_time: int
+
+
+class CollectionDetail(CollectionBase):
+    id: int
+    user_id: int
+    created_at: datetime
+    recipe_count: int
+    # newest added first; one page of them
+    recipes: List[RecipeCard]
+
+
+class CollectionSummary(CollectionDetail):
+    # pass as `cursor` to GET /api/collections/{id} for the recipes after the preview
+    next_cursor: Optional[str] = None
+
+
+class CollectionRecipesAdd(BaseModel):
+    recipe_ids: List[int]
+
+
 # ---------- SHOPPING LIST ----------
 
 class ShoppingListItem(BaseModel):
@@ -154,6 +221,17 @@ class ShoppingListCreate(ShoppingListBase):
     pass
 
 
+class ShoppingListRecipe(BaseModel):
+    recipe_id: int
+    # multiplier of the recipe's quantities (2 = double portion)
+    servings: float = Field(1.0, gt=0)
+
+
+class ShoppingListGenerate(BaseModel):
+    title: str
+    recipes: List[ShoppingListRecipe]
+
+
 class ShoppingListResponse(ShoppingListBase):
     id: int
     user_id: int
@@ -1,5 +1,8 @@
 from passlib.hash import pbkdf2_sha256
+from sqlalchemy import text
 from database import (
+    search_vector_update_sql,
+    rating_aggregates_update_sql,
     SessionLocal,
     User,
     Ingredient,
@@ -159,6 +162,11 @@ def create_seed_data():
             ))
         db.commit()
 
+        # --- Search index and rating aggregates for seeded recipes ---
+        db.execute(text(search_vector_update_sql("r.search_vector IS NULL")))
+        db.execute(text(rating_aggregates_update_sql("true")))
+        db.commit()
+
         print("Seed data created/ensured")
 
     finally:
@@ -0,0 +1,330 @@
+# backend/app/seed_synthetic.py
+"""Deterministic synthetic dataset for benchmarking and load tests.
+
+Generates users, ingredients, recipes (with recipe_ingredients), reviews, collections and
+shopping lists with realistic skew: Zipfian ingredient and recipe popularity, long-tail
+review counts, ratings biased towards 4-5. Rows are streamed into Postgres with COPY in
+chunks, so memory does not grow with the dataset size. The same --seed on an empty
+database always produces the same data.
+
+Usage:
+    python seed_synthetic.py --preset 10k [--seed 42]
+    python seed_synthetic.py --recipes 50000 --users 5000 --ingredients 3000
+"""
+
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from passlib.hash import pbkdf2_sha256
+
+from database import engine, init_db, search_vector_update_sql, FACET_CUBE_REBUILD
+
+PRESETS = {
+    "10k": {"recipes": 10_000, "users": 1_000, "ingredients": 2_000},
+    "1m": {"recipes": 1_000_000, "users": 100_000, "ingredients": 50_000},
+    "10m": {"recipes": 10_000_000, "users": 1_000_000, "ingredients": 200_000},
+}
+
+CHUNK_SIZE = 20_000
+SYNTHETIC_PASSWORD = "password"
+
+CATEGORIES = [("Main", 30), ("Breakfast", 15), ("Dessert", 15), ("Soup", 10), ("Salad", 10),
+              ("Snack", 8), ("Baking", 7), ("Drinks", 5)]
+CUISINES = [("Russian", 20), ("Italian", 18), ("French", 10), ("American", 10), ("Japanese", 8),
+            ("Georgian", 8), ("Mexican", 7), ("Indian", 7), ("Chinese", 7), (None, 5)]
+DIETS = [(None, 60), ("vegetarian", 15), ("vegan", 8), ("gluten-free", 7), ("keto", 5), ("low-fat", 5)]
+RATINGS = [(1, 5), (2, 7), (3, 15), (4, 33), (5, 40)]
+UNITS = [("г", 55), ("мл", 15), ("шт", 20), ("ст. л.", 6), ("щепотка", 4)]
+
+BASE_INGREDIENTS = [
+    "Flour", "Sugar", "Eggs", "Butter", "Milk", "Salt", "Pepper", "Onion", "Garlic", "Tomato",
+    "Potato", "Carrot", "Chicken", "Beef", "Pork", "Rice", "Pasta", "Cheese", "Cream", "Olive oil",
+    "Lemon", "Apple", "Mushrooms", "Cabbage", "Beetroot", "Dill", "Parsley", "Basil", "Honey", "Yeast",
+    "Мука", "Сахар", "Яйца", "Масло сливочное", "Молоко", "Соль", "Лук", "Чеснок", "Картофель", "Морковь",
+    "Свёкла", "Капуста", "Сметана", "Творог", "Гречка", "Укроп", "Говядина", "Курица", "Грибы", "Мёд",
+]
+QUALIFIERS = ["fresh", "dried", "smoked", "ground", "chopped", "frozen", "organic", "red", "green", "sweet",
+              "свежий", "сушёный", "копчёный", "молотый"]
+TITLE_WORDS = ["Classic", "Quick", "Homemade", "Spicy", "Creamy", "Grandma's", "Crispy", "Rustic",
+               "Summer", "Winter", "Easy", "Festive"]
+DISHES = ["Pie", "Stew", "Salad", "Soup", "Pancakes", "Casserole", "Curry", "Risotto", "Borscht",
+          "Dumplings", "Omelette", "Cake", "Bowl", "Skewers", "Bread"]
+
+
+class WeightedChoice:
+    """O(log n) sampling from a fixed discrete distribution."""
+
+    def __init__(self, values, weights):
+        self.values = list(values)
+        self.cum = list(itertools.accumulate(weights))
+
+    def __call__(self, rng: random.Random):
+        return self.values[bisect.bisect_right(self.cum, rng.random() * self.cum[-1])]
+
+
+class Zipf:
+    """Ranks 0..n-1 with probability roughly proportional to 1 / (rank + 1) ** s.
+
+    Inverse-CDF of the continuous power law, so it needs O(1) memory even for 10M ranks.
+    """
+
+    def __init__(self, n: int, s: float = 1.07):
+        self.n = n
+        self.a = 1.0 - s
+
+    def __call__(self, rng: random.Random) -> int:
+        u = rng.random()
+        if abs(self.a) < 1e-9:
+            x = math.exp(u * math.log(self.n + 1))
+        else:
+            x = (u * ((self.n + 1) ** self.a - 1) + 1) ** (1 / self.a)
+        return min(int(x) - 1, self.n - 1)
+
+
+def weighted(pairs) -> WeightedChoice:
+    return WeightedChoice([v for v, _ in pairs], [w for _, w in pairs])
+
+
+def long_tail_count(rng: random.Random, alpha: float = 1.2, cap: int = 500) -> int:
+    """Pareto-distributed count: most items get 0-2, a few get hundreds."""
+    return min(int(rng.paretovariate(alpha)) - 1, cap)
+
+
+def pick_author(rng: random.Random, users: int) -> int:
+    """Author index: a small core of prolific authors and a long tail (Pareto, capped)."""
+    return min(int(rng.paretovariate(1.1)) - 1, users - 1)
+
+
+class CopyWriter:
+    """Buffers rows for one table and sends them with COPY ... FROM STDIN (CSV)."""
+
+    def __init__(self, cursor, table: str, columns: list):
+        self.cursor = cursor
+        self.sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.rows = 0
+
+    def write(self, row):
+        self.writer.writerow(["" if v is None else v for v in row])
+        self.rows += 1
+
+    def flush(self):
+        if self.buffer.tell():
+            self.buffer.seek(0)
+            self.cursor.copy_expert(self.sql, self.buffer)
+            self.buffer.seek(0)
+            self.buffer.truncate()
+
+
+def _next_ids(cursor):
+    ids = {}
+    for table in ("users", "ingredients", "recipes", "recipe_ingredients", "reviews",
+                  "collections", "collection_recipes", "shopping_lists"):
+        cursor.execute(f"SELECT coalesce(max(id), 0) + 1 FROM {table}")
+        ids[table] = cursor.fetchone()[0]
+    return ids
+
+
+def _ingredient_names(existing: set, count: int):
+    names = (
+        list(BASE_INGREDIENTS)
+        + [f"{q} {b.lower()}" for q in QUALIFIERS for b in BASE_INGREDIENTS]
+    )
+    result = [n for n in names if n not in existing][:count]
+    i = 1
+    while len(result) < count:
+        name = f"{BASE_INGREDIENTS[i % len(BASE_INGREDIENTS)]} #{i}"
+        if name not in existing:
+            result.append(name)
+        i += 1
+    return result
+
+
+def _backfill_search_vectors(conn, first_id: int, end_id: int, log=print):
+    """Fill search_vector of recipes [first_id, end_id), CHUNK_SIZE ids per transaction.
+
+    The update leaves facets alone, but the facet-cube update trigger would still build
+    transition tables of every updated row only to find no change; it is disabled for the
+    backfill and the cube is recounted afterwards, which also covers any facet change other
+    sessions made meanwhile.
+    """
+    cur = conn.cursor()
+    cur.execute("ALTER TABLE recipes DISABLE TRIGGER recipes_facet_cube_update")
+    conn.commit()
+    try:
+        for lo in range(first_id, end_id, CHUNK_SIZE):
+            hi = min(lo + CHUNK_SIZE, end_id)
+            cur.execute(search_vector_update_sql(
+                f"r.id >= {lo} AND r.id < {hi} AND r.search_vector IS NULL"
+            ))
+            conn.commit()
+            log(f"search vectors: {hi - first_id}/{end_id - first_id}")
+    finally:
+        conn.rollback()
+        cur.execute("ALTER TABLE recipes ENABLE TRIGGER recipes_facet_cube_update")
+        for sql in FACET_CUBE_REBUILD:
+            cur.execute(sql)
+        conn.commit()
+
+
+def generate(recipes: int, users: int, ingredients: int, seed: int = 42, log=print) -> dict:
+    rng = random.Random(seed)
+    started = time.monotonic()
+    pick_category, pick_cuisine, pick_diet = weighted(CATEGORIES), weighted(CUISINES), weighted(DIETS)
+    pick_rating, pick_unit = weighted(RATINGS), weighted(UNITS)
+    pick_ingredient = Zipf(ingredients)
+    pick_recipe = Zipf(recipes, s=0.9)
+    password_hash = pbkdf2_sha256.hash(SYNTHETIC_PASSWORD)
+    epoch = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    span = (datetime(2025, 1, 1, tzinfo=timezone.utc) - epoch).total_seconds()
+
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        ids = _next_ids(cur)
+        user0, ing0, recipe0 = ids["users"], ids["ingredients"], ids["recipes"]
+
+        # --- Users ---
+        w = CopyWriter(cur, "users", ["id", "email", "password_hash", "username", "bio", "is_active", "is_staff"])
+        for i in range(users):
+            uid = user0 + i
+            w.write([uid, f"user{uid}@synthetic.cookbook", password_hash, f"user{uid}", None, True, False])
+            if w.rows % CHUNK_SIZE == 0:
+                w.flush()
+        w.flush()
+        conn.commit()
+        log(f"users: {users}")
+
+        # --- Ingredients (rank 0 is the most popular) ---
+        cur.execute("SELECT name FROM ingredients")
+        names = _ingredient_names({r[0] for r in cur.fetchall()}, ingredients)
+        w = CopyWriter(cur, "ingredients", ["id", "name", "default_unit"])
+        for i, name in enumerate(names):
+            w.write([ing0 + i, name, pick_unit(rng)])
+        w.flush()
+        conn.commit()
+        log(f"ingredients: {ingredients}")
+
+        # --- Recipes, their ingredients and reviews, chunk by chunk ---
+        recipe_w = CopyWriter(cur, "recipes", ["id", "author_id", "title", "description", "cook_time", "category",
+                                               "diet", "cuisine", "steps", "image", "rating_avg", "rating_count",
+                                               "rating_sum", "created_at"])
+        ri_w = CopyWriter(cur, "recipe_ingredients", ["id", "recipe_id", "ingredient_id", "quantity", "unit"])
+        review_w = CopyWriter(cur, "reviews", ["id", "recipe_id", "user_id", "rating", "comment", "created_at"])
+        ri_id, review_id = ids["recipe_ingredients"], ids["reviews"]
+        for i in range(recipes):
+            rid = recipe0 + i
+            created = epoch + timedelta(seconds=span * i / max(recipes, 1))
+            ing_ids = {pick_ingredient(rng) for _ in range(max(2, int(rng.gauss(8, 3))))}
+            main_ing = names[min(ing_ids)]
+            title = f"{rng.choice(TITLE_WORDS)} {main_ing.lower()} {rng.choice(DISHES).lower()}"
+            steps = [{"order": n + 1, "text": f"Step {n + 1}: prepare {names[k].lower()}."}
+                     for n, k in enumerate(sorted(ing_ids)[: rng.randint(3, 10)])]
+            for k in ing_ids:
+                ri_w.write([ri_id, rid, ing0 + k, round(rng.uniform(1, 500), 2), pick_unit(rng)])
+                ri_id += 1
+            ratings = []
+            n_reviews = min(long_tail_count(rng), users)
+            for uid in rng.sample(range(users), n_reviews) if n_reviews else ():
+                rating = pick_rating(rng)
+                ratings.append(rating)
+                review_w.write([review_id, rid, user0 + uid, rating, None,
+                                created + timedelta(days=rng.randint(0, 365))])
+                review_id += 1
+            category = pick_category(rng)
+            recipe_w.write([
+                rid, user0 + pick_author(rng, users), title[:200],
+                f"{title}. A {category.lower()} recipe with {len(ing_ids)} ingredients.",
+                max(5, min(240, int(rng.lognormvariate(3.4, 0.6)))), category,
+                pick_diet(rng), pick_cuisine(rng), json.dumps(steps, ensure_ascii=False), None,
+                # same values create_review would have produced (see crud.rating_delta_values)
+                sum(ratings) / len(ratings) if ratings else 0.0, len(ratings), sum(ratings), created.isoformat(),
+            ])
+            if (i + 1) % CHUNK_SIZE == 0 or i + 1 == recipes:
+                # parents first, so foreign keys hold at every COPY
+                recipe_w.flush()
+                ri_w.flush()
+                review_w.flush()
+                conn.commit()
+                log(f"recipes: {i + 1}/{recipes}")
+
+        # --- Collections: a third of the users, Zipfian choice of recipes ---
+        coll_w = CopyWriter(cur, "collections", ["id", "user_id", "title", "description", "is_public"])
+        cr_w = CopyWriter(cur, "collection_recipes", ["id", "collection_id", "recipe_id"])
+        list_w = CopyWriter(cur, "shopping_lists", ["id", "user_id", "title", "recipes", "items"])
+        coll_id, cr_id, list_id = ids["collections"], ids["collection_recipes"], ids["shopping_lists"]
+        for i in range(users):
+            uid = user0 + i
+            if rng.random() < 0.33:
+                for _ in range(rng.randint(1, 3)):
+                    coll_w.write([coll_id, uid, f"Collection {coll_id}", None, rng.random() < 0.7])
+                    for r in {pick_recipe(rng) for _ in range(rng.randint(3, 30))}:
+                        cr_w.write([cr_id, coll_id, recipe0 + r])
+                        cr_id += 1
+                    coll_id += 1
+            if rng.random() < 0.2:
+                picked = sorted({recipe0 + pick_recipe(rng) for _ in range(rng.randint(1, 7))})
+                items = [{"ingredient": names[pick_ingredient(rng)], "quantity": rng.randint(1, 1000),
+                          "unit": pick_unit(rng)} for _ in range(rng.randint(3, 15))]
+                list_w.write([list_id, uid, f"List {list_id}", json.dumps(picked),
+                              json.dumps(items, ensure_ascii=False)])
+                list_id += 1
+            if (i + 1) % CHUNK_SIZE == 0 or i + 1 == users:
+                coll_w.flush()
+                cr_w.flush()
+                list_w.flush()
+                conn.commit()
+        log("collections and shopping lists done")
+
+        # keep sequences ahead of the explicit ids
+        for table in ids:
+            cur.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}))"
+            )
+        conn.commit()
+        _backfill_search_vectors(conn, recipe0, recipe0 + recipes, log)
+        cur.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+    elapsed = time.monotonic() - started
+    summary = {
+        "seed": seed, "users": users, "ingredients": ingredients, "recipes": recipes,
+        "recipe_ingredients": ri_id - ids["recipe_ingredients"], "reviews": review_id - ids["reviews"],
+        "collections": coll_id - ids["collections"], "shopping_lists": list_id - ids["shopping_lists"],
+        "seconds": round(elapsed, 1),
+    }
+    log(f"done: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic CookBook dataset")
+    parser.add_argument("--preset", choices=sorted(PRESETS), help="dataset size preset")
+    parser.add_argument("--recipes", type=int)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--ingredients", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    sizes = dict(PRESETS[args.preset]) if args.preset else dict(PRESETS["10k"])
+    for key in ("recipes", "users", "ingredients"):
+        if getattr(args, key):
+            sizes[key] = getattr(args, key)
+
+    init_db()
+    generate(seed=args.seed, **sizes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+# backend/app/storage.py
+"""Storage of uploaded recipe images.
+
+Uploads are streamed to a temporary file in fixed-size chunks while their SHA-256 is
+computed, so memory use does not depend on the file size and oversized files are rejected
+as soon as they cross the limit. The file is then stored under ``<sha256><ext>``: identical
+uploads map to one file, and a finished file is only ever made visible by an atomic rename.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+
+CHUNK_SIZE = 1024 * 1024
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+# whole multipart body of an upload: the image plus the recipe JSON and the form framing
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(MAX_IMAGE_BYTES + 1024 * 1024)))
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+
+class ImageStorage:
+    """Backend holding image files by name; ``url(name)`` is what clients get.
+
+    Implementations: LocalImageStorage (the /static/images directory). Another backend
+    (e.g. an object store) only has to implement these methods.
+    """
+
+    def temp_dir(self) -> Optional[str]:
+        """Directory uploads are spooled to before ``put``; None for the system default."""
+        return None
+
+    def exists(self, name: str) -> bool:
+        raise NotImplementedError
+
+    def put(self, tmp_path: str, name: str):
+        """Store the finished file at `tmp_path` as `name`; takes ownership of `tmp_path`."""
+        raise NotImplementedError
+
+    def open(self, name: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def url(self, name: str) -> str:
+        raise NotImplementedError
+
+    def name_from_url(self, url: str) -> str:
+        return url.rsplit("/", 1)[-1]
+
+
+class LocalImageStorage(ImageStorage):
+    """Files in a local directory, served by the app's StaticFiles mount under `url_prefix`.
+
+    Uploads are spooled to `temp_directory`, which must be outside the served tree (unfinished
+    uploads must not be reachable by URL) and on the same filesystem as `directory`, so that
+    put() is a rename.
+    """
+
+    def __init__(self, directory: str, temp_directory: str, url_prefix: str = "/static/images"):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip("/")
+        self._incoming = temp_directory
+        os.makedirs(directory, exist_ok=True)
+        os.makedirs(self._incoming, exist_ok=True)
+
+    def temp_dir(self) -> Optional[str]:
+        return self._incoming
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(os.path.join(self.directory, name))
+
+    def put(self, tmp_path: str, name: str):
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+
+    def open(self, name: str) -> BinaryIO:
+        return open(os.path.join(self.directory, name), "rb")
+
+    def url(self, name: str) -> str:
+        return f"{self.url_prefix}/{name}"
+
+
+class UploadSizeLimitMiddleware:
+    """ASGI middleware capping request bodies on `paths` before anything parses them.
+
+    Starlette spools a multipart body to disk before the endpoint runs, so the check in
+    save_image alone limits neither bandwidth nor temporary disk use. A Content-Length over
+    `max_bytes` is answered with 413 without reading the body; a body without one (chunked)
+    is cut off with 413 as soon as it crosses the limit.
+    """
+
+    def __init__(self, app, paths, max_bytes: int):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def _reject(self, scope, receive, send):
+        await JSONResponse(
+            {"detail": f"Request body is larger than {self.max_bytes} bytes"},
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+        received = 0
+        cut_off = started = False
+
+        async def limited_receive():
+            nonlocal received, cut_off
+            message = await receive()
+            if message["type"] == "http.request" and not started:
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # the app sees a disconnected client and stops reading
+                    cut_off = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            # whatever the app answers to the disconnect is replaced by the 413 below
+            if not cut_off:
+                started = True
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not cut_off:
+                raise
+        if cut_off:
+            await self._reject(scope, receive, send)
+
+
+def image_extension(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower() or ".jpg"
+    if ext not in IMAGE_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported image type, use one of: {', '.join(sorted(IMAGE_EXTENSIONS))}",
+        )
+    return ext
+
+
+def save_image(stream: BinaryIO, filename: Optional[str], storage: ImageStorage = None,
+               max_bytes: int = None) -> str:
+    """Store an uploaded image and return its URL; an identical file is stored only once."""
+    storage = storage or image_storage
+    max_bytes = MAX_IMAGE_BYTES if max_bytes is None else max_bytes
+    ext = image_extension(filename)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(suffix=ext, dir=storage.temp_dir())
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Image is larger than {max_bytes} bytes",
+                    )
+                digest.update(chunk)
+                tmp.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty image")
+        name = digest.hexdigest() + ext
+        if not storage.exists(name):
+            storage.put(tmp_path, name)
+        return storage.url(name)
+    finally:
+        # left over when the upload failed or was a duplicate
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# The directory main.py mounts at /static
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "..", "static")
+# Uploads in progress: next to STATIC_DIR, not inside it
+INCOMING_DIR = os.path.join(os.path.dirname(__file__), "..", ".incoming")
+
+image_storage = LocalImageStorage(os.path.join(STATIC_DIR, "images"), os.path.join(INCOMING_DIR, "images"))
+
+
+def configure_image_storage(storage: ImageStorage):
+    """Swap the backend used by ``save_image`` (e.g. an object store, or a temp dir in tests)."""
+    global image_storage
+    image_storage = storage
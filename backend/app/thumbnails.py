@@ -0,0 +1,127 @@
+# backend/app/thumbnails.py
+"""Background generation of responsive image variants and a low-quality placeholder.
+
+upload_recipe stores the original and schedules process_image(); the response does not wait
+for it. Variants are named after the original and their real width (``<sha256>_<width>.webp``
+/ ``.jpg``; images are never upscaled), so a duplicate upload finds them already stored. When an image is done, every recipe using it
+gets `image_variants` and its cached pages are invalidated; until then clients fall back to
+the original `image`.
+"""
+
+import base64
+import io
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import update
+
+import storage
+from cache import recipe_cache, recipe_tag, RECIPE_LISTS_TAG
+from database import SessionLocal, Recipe
+
+logger = logging.getLogger("cookbook.thumbnails")
+
+VARIANT_WIDTHS = (160, 480, 1024)
+# key in image_variants -> (Pillow format, extension, save options)
+VARIANT_FORMATS = {
+    "webp": ("WEBP", ".webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", ".jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+# inlined as a data URI, shown blurred while the real image loads (~0.5 KB)
+PLACEHOLDER_WIDTH = 16
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="thumbnails")
+# images queued or being processed; beyond this, uploads keep just the original image
+IMAGE_MAX_PENDING = int(os.getenv("IMAGE_MAX_PENDING", str(IMAGE_WORKERS * 32)))
+_pending = threading.BoundedSemaphore(IMAGE_MAX_PENDING)
+
+
+def _put_image(store: storage.ImageStorage, name: str, image, fmt: str, options: dict):
+    fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(name)[1], dir=store.temp_dir())
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            image.save(tmp, fmt, **options)
+        store.put(tmp_path, name)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def build_variants(store: storage.ImageStorage, name: str) -> dict:
+    """Create the missing variants of stored image `name`; returns the `image_variants` value."""
+    from PIL import Image, ImageOps  # optional dependency, only needed by the worker
+
+    stem = os.path.splitext(name)[0]
+    with store.open(name) as f, Image.open(f) as original:
+        # phone photos are often stored sideways with an EXIF orientation tag
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    variants = []
+    for width in VARIANT_WIDTHS:
+        # never upscale: one variant at the original width covers all larger sizes
+        w = min(width, image.width)
+        if variants and variants[-1]["width"] == w:
+            break
+        resized = image if w == image.width else image.resize(
+            (w, max(1, round(image.height * w / image.width))), Image.LANCZOS
+        )
+        entry = {"width": w}
+        for key, (fmt, ext, options) in VARIANT_FORMATS.items():
+            variant_name = f"{stem}_{w}{ext}"
+            if not store.exists(variant_name):
+                _put_image(store, variant_name, resized, fmt, options)
+            entry[key] = store.url(variant_name)
+        variants.append(entry)
+
+    tiny = image.resize(
+        (PLACEHOLDER_WIDTH, max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))), Image.BILINEAR
+    )
+    buffer = io.BytesIO()
+    tiny.save(buffer, "JPEG", quality=40)
+    placeholder = "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode()
+    return {"placeholder": placeholder, "variants": variants}
+
+
+def process_image(image_url: str):
+    """Build variants for an uploaded image and attach them to the recipes that use it."""
+    store = storage.image_storage
+    data = build_variants(store, store.name_from_url(image_url))
+    db = SessionLocal()
+    try:
+        recipe_ids = db.execute(
+            update(Recipe)
+            .where(Recipe.image == image_url)
+            .values(image_variants=data, updated_at=Recipe.updated_at)
+            .returning(Recipe.id)
+        ).scalars().all()
+        db.commit()
+    finally:
+        db.close()
+    if recipe_ids:
+        recipe_cache.invalidate(RECIPE_LISTS_TAG, *(recipe_tag(i) for i in recipe_ids))
+
+
+def _process_logged(image_url: str):
+    try:
+        process_image(image_url)
+    except Exception:
+        # the recipe keeps its original image; nothing else depends on the variants
+        logger.exception("thumbnail generation failed for %s", image_url)
+    finally:
+        _pending.release()
+
+
+def schedule_image_processing(image_url: str) -> bool:
+    """Queue process_image() on the worker pool and return immediately.
+
+    Returns False (and queues nothing) when IMAGE_MAX_PENDING images are already waiting.
+    """
+    if not _pending.acquire(blocking=False):
+        logger.warning("thumbnail queue is full, %s keeps only the original image", image_url)
+        return False
+    _executor.submit(_process_logged, image_url)
+    return True
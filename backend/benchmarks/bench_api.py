@@ -0,0 +1,326 @@
+# backend/benchmarks/bench_api.py
+"""Endpoint benchmarks for the CookBook API.
+
+Drives every main read/write route either in-process through an ASGI client (no network,
+SQL queries are counted with engine events) or against a running server over HTTP, and
+reports throughput, latency percentiles and SQL queries per request. Mixed scenarios measure
+a read endpoint while logins run in the background (event-loop blocking shows up as read
+latency). Results are saved as JSON; `compare` diffs two result files and exits non-zero on
+a regression.
+
+Load a dataset first (see seed_synthetic.py), then:
+    python backend/benchmarks/bench_api.py run --mode asgi --dataset 10k -o base.json
+    python backend/benchmarks/bench_api.py run --mode http --base-url http://localhost:8000 -o new.json
+    python backend/benchmarks/bench_api.py compare base.json new.json --threshold 0.1
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+# each run registers its own user (bench-<run id>@...): reviews are one per user and recipe,
+# so a user reused across runs would have nothing left to review
+BENCH_EMAIL = "bench-{run}@synthetic.cookbook"
+BENCH_PASSWORD = "benchpass"
+SEARCH_TERMS = ["pie", "chicken", "soup", "сыр", "творог", "spicy", "quick", "grandma", "cake", "borscht", "chiken"]
+# 1x1 PNG, enough to exercise the multipart upload path
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+def _recipe_payload(rng: random.Random) -> dict:
+    n = rng.randint(3, 12)
+    return {
+        "title": f"Bench recipe {rng.randint(0, 10**9)}",
+        "description": "Created by the benchmark suite.",
+        "cook_time": rng.randint(5, 120),
+        "category": rng.choice(["Main", "Dessert", "Soup"]),
+        "cuisine": rng.choice(["Russian", "Italian", None]),
+        "steps": [{"order": i + 1, "text": f"Step {i + 1}"} for i in range(3)],
+        "ingredients": [
+            {"name": rng.choice(["Flour", "Sugar", "Eggs", "Milk", "Salt", "Мука", "Соль"]) + f" {i}",
+             "quantity": rng.randint(1, 500), "unit": "г"}
+            for i in range(n)
+        ],
+    }
+
+
+class Context:
+    """Ids and credentials shared by the scenarios."""
+
+    def __init__(self, recipe_ids: list, email: str, token: str, seed: int):
+        self.recipe_ids = recipe_ids
+        self.email = email
+        self.token = token
+        self.rng = random.Random(seed)
+        # every review needs a recipe the bench user has not reviewed yet
+        self.review_targets = itertools.cycle(list(reversed(recipe_ids)))
+
+    @property
+    def auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+# name -> (method, path, request kwargs) factory
+SCENARIOS = {
+    "list": lambda ctx: ("GET", f"/api/recipes/all?limit=50&skip={ctx.rng.randint(0, 20) * 50}", {}),
+    "search": lambda ctx: ("GET", f"/api/recipes/search?q={ctx.rng.choice(SEARCH_TERMS)}&limit=20", {}),
+    "detail": lambda ctx: ("GET", f"/api/recipes/{ctx.rng.choice(ctx.recipe_ids)}", {}),
+    "reviews": lambda ctx: ("GET", f"/api/recipes/{ctx.rng.choice(ctx.recipe_ids)}/reviews?limit=20", {}),
+    "login": lambda ctx: ("POST", "/api/auth/token", {"json": {"email": ctx.email, "password": BENCH_PASSWORD}}),
+    "create": lambda ctx: ("POST", "/api/recipes", {"json": _recipe_payload(ctx.rng), "headers": ctx.auth}),
+    "upload": lambda ctx: ("POST", "/api/recipes/upload", {
+        "data": {"recipe_json": json.dumps(_recipe_payload(ctx.rng))},
+        "files": {"image": ("bench.png", TINY_PNG, "image/png")},
+        "headers": ctx.auth,
+    }),
+    "review": lambda ctx: ("POST", f"/api/recipes/{next(ctx.review_targets)}/reviews", {
+        "json": {"rating": ctx.rng.randint(1, 5), "comment": "bench"}, "headers": ctx.auth,
+    }),
+}
+
+
+# name -> (measured scenario, scenario kept running in the background meanwhile); compare
+# with the plain measured scenario to see how much the background load slows it down
+MIXED = {
+    "detail_under_login": ("detail", "login"),
+    "list_under_login": ("list", "login"),
+}
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank definition
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class QueryCounter:
+    """Counts statements executed on the app's engines in ASGI mode.
+
+    Unlike the X-DB-Query-Count header this also sees queries run after the response
+    headers are sent (streaming bodies).
+    """
+
+    def __init__(self, engines):
+        from sqlalchemy import event
+
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+async def run_scenario(client, name: str, ctx: Context, requests: int, concurrency: int, counter=None) -> dict:
+    make = SCENARIOS[name]
+    latencies, errors, header_queries = [], 0, []
+    queue = iter(range(requests))
+    queries_before = counter.count if counter else 0
+
+    async def worker():
+        nonlocal errors
+        for _ in queue:
+            method, path, kwargs = make(ctx)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                if response.status_code >= 400:
+                    errors += 1
+                if "X-DB-Query-Count" in response.headers:
+                    header_queries.append(int(response.headers["X-DB-Query-Count"]))
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    result = {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1) if elapsed else None,
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+    if counter:
+        result["queries_per_request"] = round((counter.count - queries_before) / requests, 2)
+    elif header_queries:
+        # over HTTP the server reports its own count (see instrumentation.py)
+        result["queries_per_request"] = round(sum(header_queries) / len(header_queries), 2)
+    return result
+
+
+async def run_mixed(client, name: str, ctx: Context, requests: int, concurrency: int) -> dict:
+    measured, background = MIXED[name]
+    make = SCENARIOS[background]
+    stop = asyncio.Event()
+    done = 0
+
+    async def load():
+        nonlocal done
+        while not stop.is_set():
+            method, path, kwargs = make(ctx)
+            try:
+                await client.request(method, path, **kwargs)
+            except httpx.HTTPError:
+                pass
+            done += 1
+
+    tasks = [asyncio.create_task(load()) for _ in range(concurrency)]
+    try:
+        result = await run_scenario(client, measured, ctx, requests, concurrency)
+    finally:
+        stop.set()
+        await asyncio.gather(*tasks)
+    result["background_requests"] = done
+    return result
+
+
+async def _setup(client) -> Context:
+    run_id = uuid.uuid4().hex[:12]
+    email = BENCH_EMAIL.format(run=run_id)
+    register = await client.post(
+        "/api/auth/register", json={"email": email, "username": f"bench-{run_id}", "password": BENCH_PASSWORD}
+    )
+    register.raise_for_status()
+    login = await client.post("/api/auth/token", json={"email": email, "password": BENCH_PASSWORD})
+    login.raise_for_status()
+    page = await client.get("/api/recipes/all?limit=1000")
+    page.raise_for_status()
+    recipe_ids = [r["id"] for r in page.json()]
+    if not recipe_ids:
+        raise SystemExit("No recipes in the database, load a dataset with seed_synthetic.py first")
+    return Context(recipe_ids, email, login.json()["access_token"], seed=42)
+
+
+async def run(args) -> dict:
+    counter = None
+    if args.mode == "asgi":
+        sys.path.insert(0, APP_DIR)
+        from main import app
+        from database import ENGINES, init_db
+
+        init_db()
+        counter = QueryCounter(ENGINES.values())
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+    else:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+
+    scenarios = args.scenarios or list(SCENARIOS) + list(MIXED)
+    results = {}
+    async with client:
+        ctx = await _setup(client)
+        for name in scenarios:
+            if name in MIXED:
+                results[name] = await run_mixed(client, name, ctx, args.requests, args.concurrency)
+            else:
+                # a short warm-up so connection pools and caches are in a steady state
+                await run_scenario(client, name, ctx, min(args.warmup, args.requests), args.concurrency)
+                results[name] = await run_scenario(client, name, ctx, args.requests, args.concurrency, counter)
+            print(f"{name:12} " + "  ".join(f"{k}={v}" for k, v in results[name].items()))
+    return {"meta": _meta(args), "endpoints": results}
+
+
+def _meta(args) -> dict:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        rev = None
+    return {
+        "mode": args.mode,
+        "base_url": args.base_url if args.mode == "http" else None,
+        "dataset": args.dataset,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "git_rev": rev or None,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+# lower is better for these, higher for rps
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def compare(base: dict, new: dict, threshold: float) -> list:
+    """Return human-readable regressions of `new` against `base`."""
+    regressions = []
+    for name, b in base["endpoints"].items():
+        n = new["endpoints"].get(name)
+        if not n:
+            continue
+        for key in LATENCY_KEYS:
+            if b[key] and n[key] > b[key] * (1 + threshold):
+                regressions.append(f"{name}: {key} {b[key]} -> {n[key]}")
+        if b["rps"] and n["rps"] < b["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {b['rps']} -> {n['rps']}")
+        if "queries_per_request" in b and n.get("queries_per_request", 0) > b["queries_per_request"]:
+            regressions.append(f"{name}: queries/request {b['queries_per_request']} -> {n['queries_per_request']}")
+        if n["errors"] > b["errors"]:
+            regressions.append(f"{name}: errors {b['errors']} -> {n['errors']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CookBook API benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="run the benchmark suite")
+    run_p.add_argument("--mode", choices=["asgi", "http"], default="asgi")
+    run_p.add_argument("--base-url", default="http://localhost:8000")
+    run_p.add_argument("--dataset", default="unknown", help="label of the loaded dataset, e.g. 10k or 1m")
+    run_p.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    run_p.add_argument("--concurrency", type=int, default=16)
+    run_p.add_argument("--warmup", type=int, default=50)
+    run_p.add_argument("--scenarios", nargs="*", choices=list(SCENARIOS) + list(MIXED),
+                       help="default: all; *_under_login measure reads while logins run concurrently")
+    run_p.add_argument("-o", "--output", help="write results JSON here")
+
+    cmp_p = sub.add_parser("compare", help="compare two result files")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        results = asyncio.run(run(args))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(base, new, args.threshold)
+    for line in regressions:
+        print("REGRESSION", line)
+    if not regressions:
+        print("no regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# backend/tests/test_async_crud.py
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import crud
+import crud_async
+from cache import recipe_cache
+from database import ASYNC_DATABASE_URL
+
+
+def run_async(call):
+    """Run `call(session)` on an AsyncSession of a throwaway engine bound to this event loop."""
+    async def run():
+        engine = create_async_engine(ASYNC_DATABASE_URL)
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                return await call(db)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_async_reads_match_sync_reads(db, client, auth_headers, create_recipe):
+    omelette = create_recipe("Омлет", (("Яйца", 2, "шт"), ("Молоко", 100, "мл")), cuisine="Французская")
+    create_recipe("Каша", (("Гречка", 100, "г"),))
+    client.post(f"/api/recipes/{omelette['id']}/reviews", json={"rating": 4}, headers=auth_headers)
+
+    reads = [
+        ("get_recipes_page", dict(limit=1)),
+        ("get_recipes_page", dict(sort="rating")),
+        ("search_recipes_page", dict(q="яйца")),
+        ("search_recipes_page", dict(q="омлт")),  # no full-text hit: fuzzy fallback
+        ("filter_recipes_page", dict(filters={"cuisine": "Французская"})),
+        ("get_recipe_entry", dict(recipe_id=omelette["id"])),
+        ("get_recipes_by_ids", dict(recipe_ids=[omelette["id"], 999999])),
+    ]
+    for name, kwargs in reads:
+        # both paths share cache entries, so each has to miss to be compared
+        recipe_cache.clear()
+        expected = getattr(crud, name)(db, **kwargs)
+        assert expected[0], name
+        recipe_cache.clear()
+        assert run_async(lambda adb: getattr(crud_async, name)(adb, **kwargs)) == expected, name
+
+    reviews, _ = run_async(lambda adb: crud_async.get_reviews_page(adb, omelette["id"]))
+    assert [r.rating for r in reviews] == [4]
+    user = run_async(lambda adb: crud_async.get_user_by_email(adb, "cook@example.com"))
+    assert user.username == "cook"
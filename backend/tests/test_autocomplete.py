@@ -0,0 +1,41 @@
+# backend/tests/test_autocomplete.py
+import threading
+
+from sqlalchemy import text
+
+from ingredient_index import ingredient_index
+
+
+def test_autocomplete_ranks_by_usage(client, create_recipe):
+    create_recipe("Блины", ingredients=(("Молоко", 500, "мл"), ("Мука", 200, "г")))
+    create_recipe("Оладьи", ingredients=(("Мука", 200, "г"),))
+
+    suggestions = client.get("/api/ingredients/autocomplete", params={"q": "м"}).json()
+    assert suggestions == [{"name": "Мука", "count": 2}, {"name": "Молоко", "count": 1}]
+
+
+def test_sync_picks_up_recipes_of_other_workers(client, db, create_recipe, monkeypatch):
+    recipe = create_recipe("Блины", ingredients=(("Мука", 200, "г"),))
+    # written by "another worker": straight to the database, bypassing this process's commit hooks
+    ingredient_id = db.execute(text("INSERT INTO ingredients (name) VALUES ('Мёд') RETURNING id")).scalar()
+    copy = db.execute(text(
+        "INSERT INTO recipes (title, description, cook_time, category, steps, author_id) "
+        "SELECT title, description, cook_time, category, steps, author_id FROM recipes WHERE id = :id RETURNING id"
+    ), {"id": recipe["id"]}).scalar()
+    db.execute(text("INSERT INTO recipe_ingredients (recipe_id, ingredient_id, quantity, unit) VALUES (:r, :i, 1, 'г')"),
+               {"r": copy, "i": ingredient_id})
+    db.commit()
+    assert client.get("/api/ingredients/autocomplete", params={"q": "мё"}).json() == []
+
+    monkeypatch.setattr(ingredient_index, "synced_at", 0.0)
+    ingredient_index.sync()
+    assert client.get("/api/ingredients/autocomplete", params={"q": "мё"}).json() == [{"name": "Мёд", "count": 1}]
+
+
+def test_start_sync_runs_one_background_thread(client):
+    def sync_threads():
+        return [t.name for t in threading.enumerate()].count("ingredient-index-sync")
+
+    ingredient_index.start_sync()  # already running if the app's startup ran
+    ingredient_index.start_sync()
+    assert sync_threads() == 1
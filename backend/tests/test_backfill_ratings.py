@@ -0,0 +1,14 @@
+# backend/tests/test_backfill_ratings.py
+from sqlalchemy import text
+
+from backfill_ratings import backfill_ratings
+
+
+def test_backfill_repairs_ratings_and_invalidates_cached_recipes(client, db, create_recipe):
+    recipe = create_recipe("Омлет")
+    db.execute(text("UPDATE recipes SET rating_count = 2, rating_sum = 9, rating_avg = 4.5"))
+    db.commit()
+    assert client.get(f"/api/recipes/{recipe['id']}").json()["rating_avg"] == 4.5
+
+    assert backfill_ratings(db)["fixed"] == 1
+    assert client.get(f"/api/recipes/{recipe['id']}").json()["rating_avg"] == 0
@@ -0,0 +1,23 @@
+# backend/tests/test_batch.py
+import main
+
+
+def test_batch_keeps_order_and_reports_missing(client, create_recipe):
+    first, second = create_recipe("Омлет"), create_recipe("Каша")
+    ids = f"{second['id']},999999,{first['id']},{second['id']}"
+
+    response = client.get("/api/recipes", params={"ids": ids})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item and item["id"] for item in body["items"]] == [second["id"], None, first["id"]]
+    assert body["not_found"] == [999999]
+
+    cached = client.get("/api/recipes", params={"ids": ids}, headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_batch_rejects_bad_ids(client, db, monkeypatch):
+    assert client.get("/api/recipes", params={"ids": "1,x"}).status_code == 400
+    monkeypatch.setattr(main, "MAX_BATCH_IDS", 2)
+    assert client.get("/api/recipes", params={"ids": "1,2,3"}).status_code == 400
+    assert client.get("/api/recipes").json() == {"message": "CookBook API is running"}
@@ -0,0 +1,69 @@
+# backend/tests/test_cache.py
+import asyncio
+import threading
+
+from cache import LRUCache, RedisBackend, TaggedCache
+
+
+class FakeRedis:
+    """Dict-backed stand-in for a redis client that records the threads it was called from."""
+
+    def __init__(self):
+        self.data = {}
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.threads.add(threading.get_ident())
+        return [self.data.get(k) for k in keys]
+
+    def set(self, key, value, ex=None):
+        self.threads.add(threading.get_ident())
+        self.data[key] = value
+
+    def incr(self, key):
+        # redis hands counters back as strings, like every other value
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+def test_aget_or_set_keeps_redis_calls_off_the_event_loop():
+    client = FakeRedis()
+    cache = TaggedCache(RedisBackend(client))
+
+    async def run():
+        async def load():
+            return {"n": 1}
+
+        loop_thread = threading.get_ident()
+        first = await cache.aget_or_set("k", load, tags=["recipes"])
+        second = await cache.aget_or_set("k", load, tags=["recipes"])
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(run())
+    assert first == second == {"n": 1}
+    assert cache.hits == 1 and cache.misses == 1
+    assert client.threads and loop_thread not in client.threads
+
+
+def test_invalidate_hides_tagged_entries():
+    cache = TaggedCache(LRUCache())
+    cache.set("page", [1], tags=["recipes"])
+    cache.set("recipe", {"id": 1}, tags=["recipe:1"])
+    cache.invalidate("recipes")
+    assert cache.get("page", tags=["recipes"]) is None
+    assert cache.get("recipe", tags=["recipe:1"]) == {"id": 1}
+
+
+def test_redis_caches_do_not_share_keys_or_tags():
+    client = FakeRedis()
+    recipes = TaggedCache(RedisBackend(client, prefix="cookbook:recipes:"))
+    principals = TaggedCache(RedisBackend(client, prefix="cookbook:auth:"))
+    recipes.set("k", "recipe", tags=["t"])
+    principals.set("k", "principal", tags=["t"])
+    recipes.invalidate("t")
+    assert recipes.get("k", tags=["t"]) is None
+    assert principals.get("k", tags=["t"]) == "principal"
@@ -0,0 +1,49 @@
+# backend/tests/test_collections.py
+from conftest import raw_cursor, register
+
+
+def make_collection(client, headers, title="Любимое", is_public=True):
+    response = client.post("/api/collections", json={"title": title, "is_public": is_public}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_bulk_add_skips_duplicates_and_unknown_recipes(client, auth_headers, create_recipe):
+    ids = [create_recipe(f"Рецепт {i}")["id"] for i in range(3)]
+    coll = make_collection(client, auth_headers)
+    url = f"/api/collections/{coll['id']}/recipes/bulk"
+
+    assert client.post(url, json={"recipe_ids": ids[:2]}, headers=auth_headers).json() == {"added": ids[:2]}
+    added = client.post(url, json={"recipe_ids": [*ids, 999999]}, headers=auth_headers).json()
+    assert added == {"added": ids[2:]}
+
+
+def test_collection_cards_page_newest_added_first(client, auth_headers, create_recipe):
+    ids = [create_recipe(f"Рецепт {i}")["id"] for i in range(3)]
+    coll = make_collection(client, auth_headers)
+    for recipe_id in ids:
+        client.post(f"/api/collections/{coll['id']}/recipes", json={"recipe_id": recipe_id}, headers=auth_headers)
+
+    first = client.get(f"/api/collections/{coll['id']}", params={"limit": 2})
+    assert first.status_code == 200
+    assert first.json()["recipe_count"] == 3
+    assert [c["id"] for c in first.json()["recipes"]] == ids[:0:-1]
+    rest = client.get(f"/api/collections/{coll['id']}", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [c["id"] for c in rest.json()["recipes"]] == ids[:1]
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_private_collection_is_visible_to_its_owner_only(client, auth_headers):
+    coll = make_collection(client, auth_headers, is_public=False)
+    other = register(client, "guest@example.com")
+
+    assert client.get(f"/api/collections/{coll['id']}", headers=auth_headers).status_code == 200
+    assert client.get(f"/api/collections/{coll['id']}", headers=other).status_code == 404
+    assert coll["id"] not in [c["id"] for c in client.get("/api/collections").json()]
+
+
+def test_collection_cursors_reject_malformed_values(client, auth_headers):
+    coll = make_collection(client, auth_headers)
+    for bad in ({"k": "c", "v": ["x"]}, {"k": "c", "v": [1, 2]}, {"k": "e", "v": [True]}):
+        assert client.get("/api/collections", params={"cursor": raw_cursor(bad)}).status_code == 400
+        assert client.get(f"/api/collections/{coll['id']}", params={"cursor": raw_cursor(bad)}).status_code == 400
@@ -0,0 +1,42 @@
+# backend/tests/test_create_recipe.py
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import DataError
+
+import crud
+import schemas
+from conftest import recipe_payload
+from database import Ingredient, Recipe, User
+
+
+@pytest.fixture
+def author(db):
+    user = User(email="cook@example.com", username="cook", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def test_create_recipe_upserts_ingredients_in_one_commit(db, author):
+    existing = crud.get_or_create_ingredient(db, "Мука", "г")
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(session))
+
+    data = crud.create_recipe(db, schemas.RecipeCreate(**recipe_payload(
+        "Блины", (("Мука", 200, "г"), ("Яйца", 2, "шт"), ("Молоко", 300, "мл"))
+    )), author)
+
+    assert len(commits) == 1
+    assert {i["name"] for i in data["ingredients"]} == {"Мука", "Яйца", "Молоко"}
+    ingredients = dict(db.execute(select(Ingredient.name, Ingredient.id)).all())
+    assert len(ingredients) == 3 and ingredients["Мука"] == existing.id
+
+
+def test_failed_create_leaves_nothing_behind(db, author):
+    with pytest.raises(DataError):
+        crud.create_recipe(db, schemas.RecipeCreate(**recipe_payload(
+            "Блины", (("Мука", 200, "г"), ("Яйца", 10 ** 6, "шт"))  # quantity is DECIMAL(6, 2)
+        )), author)
+    db.rollback()
+    assert db.execute(select(Ingredient.name)).all() == []
+    assert db.execute(select(Recipe.id)).all() == []
@@ -0,0 +1,70 @@
+# backend/tests/test_cursors.py
+import base64
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from conftest import raw_cursor
+from crud import encode_cursor, decode_cursor, cursor_int, cursor_float, cursor_datetime
+
+
+def test_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    cursor = encode_cursor("t", [created_at.isoformat(), 42])
+    assert decode_cursor(cursor, "t", cursor_datetime, cursor_int) == [created_at, 42]
+    assert decode_cursor(encode_cursor("a", [4, 7]), "a", cursor_float, cursor_int) == [4.0, 7]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 !",
+    raw_cursor([1, 2]),
+    raw_cursor({"k": "r", "v": [1.0, 2]}),  # another kind
+    raw_cursor({"k": "t", "v": [1]}),  # too short
+    raw_cursor({"k": "t", "v": ["2024-05-01T12:30:00+00:00", 1, 2]}),  # too long
+    raw_cursor({"k": "t", "v": {"a": 1, "b": 2}}),
+    raw_cursor({"k": "t", "v": ["yesterday", 1]}),
+    raw_cursor({"k": "t", "v": ["2024-05-01T12:30:00+00:00", "1"]}),
+    raw_cursor({"k": "t", "v": ["2024-05-01T12:30:00+00:00", 1.5]}),
+    raw_cursor({"k": "t", "v": ["2024-05-01T12:30:00+00:00", True]}),
+])
+def test_malformed_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor, "t", cursor_datetime, cursor_int)
+    assert e.value.status_code == 400
+
+
+def test_non_finite_float_is_400():
+    # json.loads accepts NaN, it must not become a bind parameter
+    cursor = base64.urlsafe_b64encode(b'{"k":"a","v":[NaN,1]}').decode()
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, "a", cursor_float, cursor_int)
+
+
+def test_listing_pages_and_rejects_bad_cursor(client, create_recipe):
+    ids = [create_recipe(f"Рецепт {i}")["id"] for i in range(5)]
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/recipes/all", params=params)
+        assert response.status_code == 200
+        seen += [r["id"] for r in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == sorted(ids, reverse=True)
+
+    response = client.get("/api/recipes/all", params={"cursor": raw_cursor({"k": "t", "v": [1]})})
+    assert response.status_code == 400
+
+
+def test_rating_sort_pages_and_rejects_bad_cursor(client, create_recipe, auth_headers):
+    ids = [create_recipe(f"Рецепт {i}")["id"] for i in range(3)]
+    assert client.post(f"/api/recipes/{ids[0]}/reviews", json={"rating": 5}, headers=auth_headers).status_code == 200
+    first = client.get("/api/recipes/all", params={"sort": "rating", "limit": 2})
+    assert [r["id"] for r in first.json()] == [ids[0], ids[2]]
+    rest = client.get("/api/recipes/all", params={"sort": "rating", "limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [r["id"] for r in rest.json()] == [ids[1]]
+
+    for bad in ({"k": "a", "v": [1]}, {"k": "a", "v": ["high", 1]}):
+        assert client.get("/api/recipes/all", params={"sort": "rating", "cursor": raw_cursor(bad)}).status_code == 400
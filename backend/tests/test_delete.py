@@ -0,0 +1,23 @@
+# backend/tests/test_delete.py
+from conftest import register
+
+
+def test_delete_recipe_listing_an_ingredient_twice(client, auth_headers, create_recipe):
+    recipe = create_recipe("Блины", ingredients=(("Мука", 200, "г"), ("Мука", 50, "г"), ("Молоко", 500, "мл")))
+    guest = register(client, "guest@example.com")
+    assert client.post(f"/api/recipes/{recipe['id']}/reviews", json={"rating": 4}, headers=guest).status_code == 200
+    coll = client.post("/api/collections", json={"title": "Завтраки"}, headers=auth_headers).json()
+    client.post(f"/api/collections/{coll['id']}/recipes", json={"recipe_id": recipe["id"]}, headers=auth_headers)
+
+    response = client.delete(f"/api/recipes/{recipe['id']}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert client.get(f"/api/recipes/{recipe['id']}").status_code == 404
+    assert client.get(f"/api/collections/{coll['id']}").json()["recipe_count"] == 0
+    assert client.get("/api/recipes/match", params={"ingredients": "мука,молоко"}).json() == []
+
+
+def test_delete_recipe_of_another_user_is_forbidden(client, create_recipe):
+    recipe = create_recipe("Блины")
+    other = register(client, "guest@example.com")
+    assert client.delete(f"/api/recipes/{recipe['id']}", headers=other).status_code == 403
+    assert client.get(f"/api/recipes/{recipe['id']}").status_code == 200
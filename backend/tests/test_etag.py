@@ -0,0 +1,31 @@
+# backend/tests/test_etag.py
+import pytest
+
+
+@pytest.mark.parametrize("path", ["/api/recipes/all", "/api/recipes/search?q=омлет", "/api/recipes/{id}"])
+def test_unchanged_resource_is_304(client, create_recipe, path):
+    recipe = create_recipe("Омлет")
+    path = path.format(id=recipe["id"])
+
+    first = client.get(path)
+    assert first.status_code == 200 and first.headers["Cache-Control"].startswith("public")
+    etag = first.headers["ETag"]
+
+    again = client.get(path, headers={"If-None-Match": f"W/{etag}, \"other\""})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == etag
+
+
+def test_writes_change_the_etag(client, auth_headers, create_recipe):
+    recipe = create_recipe("Омлет")
+    detail, listing = client.get(f"/api/recipes/{recipe['id']}"), client.get("/api/recipes/all")
+
+    # no endpoint edits a recipe in place; a review updates its rating
+    review = {"rating": 5, "comment": "Вкусно"}
+    assert client.post(f"/api/recipes/{recipe['id']}/reviews", json=review, headers=auth_headers).status_code == 200
+    changed = client.get(f"/api/recipes/{recipe['id']}", headers={"If-None-Match": detail.headers["ETag"]})
+    assert changed.status_code == 200 and changed.headers["ETag"] != detail.headers["ETag"]
+
+    create_recipe("Каша")
+    changed = client.get("/api/recipes/all", headers={"If-None-Match": listing.headers["ETag"]})
+    assert changed.status_code == 200 and len(changed.json()) == 2
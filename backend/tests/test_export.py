@@ -0,0 +1,32 @@
+# backend/tests/test_export.py
+import csv
+import io
+import json
+
+from export import iter_csv, iter_ndjson
+
+
+def test_ndjson_streams_one_chunk_per_batch(client, create_recipe):
+    for title in ("Омлет", "Каша", "Суп"):
+        create_recipe(title, (("Мука", 200, "г"), ("Соль", 1, "щепотка")))
+
+    chunks = list(iter_ndjson(batch_size=2))
+
+    assert [chunk.count("\n") for chunk in chunks] == [2, 1]
+    records = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert sorted(r["title"] for r in records) == ["Каша", "Омлет", "Суп"]
+    assert all(len(r["ingredients"]) == 2 and r["steps"] for r in records)
+
+
+def test_csv_export_endpoint(client, create_recipe):
+    create_recipe("Омлет, с луком", (("Яйца", 2, "шт"),))
+
+    assert list(iter_csv(batch_size=1))[0].startswith("id,author_id,title")
+    response = client.get("/api/recipes/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/csv")
+    assert response.headers["Content-Disposition"] == 'attachment; filename="recipes.csv"'
+    (row,) = csv.DictReader(io.StringIO(response.text))
+    assert row["title"] == "Омлет, с луком"
+    assert json.loads(row["ingredients"])[0]["name"] == "Яйца"
+    assert client.get("/api/recipes/export", params={"format": "xml"}).status_code == 400
@@ -0,0 +1,52 @@
+# backend/tests/test_filter.py
+
+
+def test_filter_counts_facets_without_their_own_filter(client, create_recipe):
+    create_recipe("Омлет", category="Завтрак", cook_time=10)
+    create_recipe("Каша", category="Завтрак", cook_time=40)
+    create_recipe("Плов", category="Ужин", cook_time=90)
+
+    response = client.get("/api/recipes/filter", params={"category": "Завтрак"})
+    assert response.status_code == 200
+    body = response.json()
+    assert {r["title"] for r in body["items"]} == {"Омлет", "Каша"}
+    assert body["total"] == 2
+    assert body["facets"]["category"] == {"Завтрак": 2, "Ужин": 1}
+    assert body["truncated"] is False
+
+
+def test_filter_with_query_matches_its_facets(client, create_recipe):
+    create_recipe("Суп гороховый", category="Обед", cook_time=60)
+    create_recipe("Суп томатный", category="Ужин", cook_time=20)
+    create_recipe("Суп сырный", category="Ужин", cook_time=90)
+    create_recipe("Салат", category="Ужин", cook_time=10)
+
+    response = client.get("/api/recipes/filter", params={"q": "суп", "category": "Ужин"})
+    assert response.status_code == 200
+    body = response.json()
+    assert {r["title"] for r in body["items"]} == {"Суп томатный", "Суп сырный"}
+    assert body["total"] == len(body["items"])
+    assert body["facets"]["category"] == {"Обед": 1, "Ужин": 2}
+    assert sum(body["facets"]["cook_time"].values()) == body["total"]
+
+
+def test_filter_with_query_reports_truncated_counts(client, create_recipe, monkeypatch):
+    import crud
+
+    for i in range(3):
+        create_recipe(f"Пирог {i}", category="Выпечка")
+    monkeypatch.setattr(crud, "SEARCH_MAX_CANDIDATES", 2)
+    body = client.get("/api/recipes/filter", params={"q": "пирог", "category": "Выпечка"}).json()
+    assert len(body["items"]) == body["total"] == 2
+    assert body["truncated"] is True
+
+
+def test_filter_with_query_is_not_truncated_at_exactly_the_cap(client, create_recipe, monkeypatch):
+    import crud
+
+    for i in range(2):
+        create_recipe(f"Пирог {i}", category="Выпечка")
+    monkeypatch.setattr(crud, "SEARCH_MAX_CANDIDATES", 2)
+    body = client.get("/api/recipes/filter", params={"q": "пирог"}).json()
+    assert body["total"] == 2
+    assert body["truncated"] is False
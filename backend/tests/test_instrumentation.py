@@ -0,0 +1,38 @@
+# backend/tests/test_instrumentation.py
+import json
+import logging
+import re
+
+import instrumentation
+
+
+def test_server_timing_and_metrics(client, create_recipe):
+    recipe = create_recipe("Омлет")
+
+    response = client.get(f"/api/recipes/{recipe['id']}")
+    queries = int(response.headers["X-DB-Query-Count"])
+    assert queries > 0
+    assert re.fullmatch(
+        rf'db;dur=[\d.]+;desc="{queries} queries", app;dur=[\d.]+', response.headers["Server-Timing"]
+    )
+    assert client.get("/api/recipes/999999").status_code == 404
+
+    text = client.get("/metrics").text
+    labels = 'method="GET",route="/api/recipes/{recipe_id}"'
+    assert f'cookbook_http_requests_total{{{labels},status="200"}}' in text
+    assert f'cookbook_http_requests_total{{{labels},status="404"}}' in text
+    assert f'cookbook_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}' in text
+    assert re.search(rf"cookbook_db_queries_total{{{re.escape(labels)}}} [1-9]", text)
+    assert 'cookbook_db_pool_size{engine="primary"}' in text
+
+
+def test_slow_queries_are_logged_with_parameters(client, create_recipe, monkeypatch, caplog):
+    recipe = create_recipe("Омлет")
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 1e-6)
+
+    with caplog.at_level(logging.WARNING, logger="cookbook.sql"):
+        client.get(f"/api/recipes/{recipe['id']}")
+
+    events = [json.loads(r.message) for r in caplog.records if r.name == "cookbook.sql"]
+    assert events and all(e["event"] == "slow_query" and e["statement"] for e in events)
+    assert any(str(recipe["id"]) in e["parameters"] for e in events)
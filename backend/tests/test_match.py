@@ -0,0 +1,56 @@
+# backend/tests/test_match.py
+import random
+
+from ingredient_index import IngredientIndex, _add_sliced, _bitmap, _equal_sliced
+
+
+def brute_force_match(recipes: dict, given: set, max_missing: int, limit: int) -> list:
+    hits = [(len(ids - given), r) for r, ids in recipes.items() if ids & given and len(ids - given) <= max_missing]
+    return [(r, missing) for missing, r in sorted(hits, key=lambda h: (h[0], -h[1]))][:limit]
+
+
+def test_sliced_arithmetic_matches_integers():
+    rng = random.Random(1)
+    values = {position: rng.randint(0, 40) for position in range(64)}
+    other = {position: rng.randint(0, 40) for position in range(64)}
+
+    def sliced(numbers):
+        return [_bitmap([p for p, n in numbers.items() if (n >> j) & 1]) for j in range(6)]
+
+    total = _add_sliced(sliced(values), sliced(other))
+    for position in range(64):
+        assert sum(((plane >> position) & 1) << j for j, plane in enumerate(total)) == values[position] + other[position]
+    equal = _equal_sliced(sliced(values), sliced(other), _bitmap(list(range(64))))
+    assert equal == _bitmap([p for p in range(64) if values[p] == other[p]])
+
+
+def test_match_agrees_with_brute_force():
+    rng = random.Random(7)
+    recipes = {r: set(rng.sample(range(1, 30), rng.randint(1, 8))) for r in range(1, 400)}
+    index = IngredientIndex()
+    index._ready.set()
+    index.add_recipes(recipes)
+    removed = set(rng.sample(sorted(recipes), 40))
+    index.remove_recipes(removed)
+    alive = {r: ids for r, ids in recipes.items() if r not in removed}
+
+    for _ in range(20):
+        given = set(rng.sample(range(1, 30), rng.randint(1, 10)))
+        max_missing, limit = rng.randint(0, 3), rng.randint(1, 50)
+        assert index.match(given, max_missing, limit) == brute_force_match(alive, given, max_missing, limit)
+
+
+def test_match_endpoint(client, create_recipe):
+    omelette = create_recipe("Омлет", ingredients=(("Яйца", 3, "шт"), ("Молоко", 100, "мл")))
+    pancakes = create_recipe("Блины", ingredients=(("Яйца", 2, "шт"), ("Молоко", 500, "мл"), ("Мука", 200, "г")))
+    create_recipe("Салат", ingredients=(("Огурцы", 2, "шт"),))
+
+    response = client.get("/api/recipes/match", params={"ingredients": "яйца, МОЛОКО", "max_missing": 1})
+    assert response.status_code == 200
+    assert [(r["id"], r["missing"], r["missing_ingredients"]) for r in response.json()] == [
+        (omelette["id"], 0, []),
+        (pancakes["id"], 1, ["Мука"]),
+    ]
+    assert client.get("/api/recipes/match", params={"ingredients": " , "}).status_code == 400
+    assert client.get("/api/recipes/match", params={"ingredients": "яйца", "max_missing": -1}).status_code == 400
+
@@ -0,0 +1,41 @@
+# backend/tests/test_password_hasher.py
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+import auth
+from auth import PasswordHasher
+
+
+def test_hasher_runs_on_its_pool_and_rejects_beyond_max_pending():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    release = threading.Event()
+
+    def slow_hash():
+        release.wait(5)
+        return threading.current_thread().name
+
+    async def run():
+        first = asyncio.ensure_future(hasher.run(slow_hash))
+        await asyncio.sleep(0)
+        assert hasher.pending == 1
+        with pytest.raises(HTTPException) as rejected:
+            await hasher.run(slow_hash)
+        assert rejected.value.status_code == 503 and rejected.value.headers == {"Retry-After": "1"}
+        release.set()
+        return await first
+
+    assert asyncio.run(run()).startswith("password-hash")
+    assert hasher.pending == 0
+
+
+def test_login_is_503_when_the_hasher_is_saturated(client, auth_headers, monkeypatch):
+    login = {"email": "cook@example.com", "password": "secret123"}
+    monkeypatch.setattr(auth.password_hasher, "max_pending", 0)
+    response = client.post("/api/auth/token", json=login)
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+
+    monkeypatch.undo()
+    assert client.post("/api/auth/token", json=login).status_code == 200
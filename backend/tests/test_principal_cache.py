@@ -0,0 +1,51 @@
+# backend/tests/test_principal_cache.py
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from auth import get_current_user
+from database import User, engine
+
+
+def token_of(headers) -> str:
+    return headers["Authorization"].removeprefix("Bearer ")
+
+
+def test_cached_principal_costs_no_query(db, auth_headers):
+    token = token_of(auth_headers)
+    assert get_current_user(token, db).email == "cook@example.com"
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert get_current_user(token, db).username == "cook"
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert statements == []
+
+
+def test_user_update_drops_the_cached_principal(db, auth_headers):
+    token = token_of(auth_headers)
+    get_current_user(token, db)
+
+    user = db.query(User).filter(User.email == "cook@example.com").one()
+    user.username = "chef"
+    db.commit()
+    assert get_current_user(token, db).username == "chef"
+
+    user.is_active = False
+    db.commit()
+    with pytest.raises(HTTPException) as rejected:
+        get_current_user(token, db)
+    assert rejected.value.status_code == 401
+
+
+def test_email_change_drops_the_principal_of_the_old_email(db, auth_headers):
+    token = token_of(auth_headers)
+    get_current_user(token, db)
+
+    db.query(User).filter(User.email == "cook@example.com").one().email = "chef@example.com"
+    db.commit()
+    with pytest.raises(HTTPException):
+        get_current_user(token, db)
@@ -0,0 +1,107 @@
+# backend/tests/test_routing.py
+import asyncio
+
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import crud_async
+from database import (
+    ASYNC_DATABASE_URL, ENGINES, Recipe, RoutingSession, User, pool_options, pool_stats, read_from_primary,
+)
+
+
+def statement_log(engine) -> list:
+    log = []
+    event.listen(engine, "before_cursor_execute", lambda *args: log.append(args[2]))
+    return log
+
+
+def make_engines():
+    """Two SQLite databases standing in for a primary and its replica."""
+    primary, replica = create_engine("sqlite://"), create_engine("sqlite://")
+    for e in (primary, replica):
+        User.__table__.create(e)
+    return primary, replica
+
+
+def test_selects_go_to_the_replica():
+    primary, replica = make_engines()
+    primary_log, replica_log = statement_log(primary), statement_log(replica)
+    with RoutingSession(primary=primary, replicas=[replica]) as session:
+        session.execute(select(User.id))
+        session.execute(select(User.id).where(User.id == 1))
+    assert len(replica_log) == 2 and primary_log == []
+
+
+def test_session_stays_on_the_primary_after_a_flush_even_after_rollback():
+    primary, replica = make_engines()
+    replica_log = statement_log(replica)
+    with RoutingSession(primary=primary, replicas=[replica]) as session:
+        session.add(User(email="cook@example.com", username="cook", password_hash="x"))
+        session.flush()
+        session.rollback()
+        assert session.execute(select(User.id)).all() == []
+    assert replica_log == []
+
+
+def test_locking_and_textual_statements_go_to_the_primary():
+    primary, replica = make_engines()
+    with RoutingSession(primary=primary, replicas=[replica]) as session:
+        assert session.get_bind(clause=select(User.id).with_for_update()) is primary
+        assert session.get_bind(clause=select(User.id)) is primary
+    with RoutingSession(primary=primary, replicas=[replica]) as session:
+        assert session.get_bind(clause=text("SELECT 1")) is primary
+
+
+def test_read_from_primary_pins_the_session():
+    primary, replica = make_engines()
+    with RoutingSession(primary=primary, replicas=[replica]) as session:
+        read_from_primary(session)
+        assert session.get_bind(clause=select(User.id)) is primary
+
+
+def test_cache_misses_are_read_from_the_primary(create_recipe):
+    recipe = create_recipe("Омлет")
+
+    async def run():
+        primary, replica = create_async_engine(ASYNC_DATABASE_URL), create_async_engine(ASYNC_DATABASE_URL)
+        replica_log = statement_log(replica.sync_engine)
+        try:
+            async with AsyncSession(
+                sync_session_class=RoutingSession, primary=primary.sync_engine, replicas=[replica.sync_engine]
+            ) as db:
+                await db.execute(select(Recipe.id).limit(1))
+                assert len(replica_log) == 1
+                data, _ = await crud_async.get_recipe_entry(db, recipe["id"])
+                assert data["title"] == "Омлет"
+                assert len(replica_log) == 1
+        finally:
+            await primary.dispose()
+            await replica.dispose()
+
+    asyncio.run(run())
+
+
+def test_pool_options_come_from_the_environment(monkeypatch):
+    settings = [("DB_POOL_SIZE", "20"), ("DB_MAX_OVERFLOW", "0"), ("DB_POOL_TIMEOUT", "2.5"),
+                ("DB_POOL_RECYCLE", "60"), ("DB_POOL_PRE_PING", "0")]
+    for name, _ in settings:
+        monkeypatch.delenv(name, raising=False)
+    assert pool_options() == {
+        "pool_size": 5, "max_overflow": 10, "pool_timeout": 30.0, "pool_recycle": 1800, "pool_pre_ping": True,
+    }
+    for name, value in settings:
+        monkeypatch.setenv(name, value)
+    options = pool_options()
+    assert options == {
+        "pool_size": 20, "max_overflow": 0, "pool_timeout": 2.5, "pool_recycle": 60, "pool_pre_ping": False,
+    }
+
+    engine = create_engine("postgresql+psycopg2://localhost/none", **options)
+    assert (engine.pool.size(), engine.pool._max_overflow, engine.pool._timeout) == (20, 0, 2.5)
+
+
+def test_pool_stats_cover_every_engine():
+    stats = pool_stats()
+    assert set(stats) == set(ENGINES) >= {"primary", "primary_async"}
+    assert set(stats["primary"]) == {"size", "checked_out", "checked_in", "overflow"}
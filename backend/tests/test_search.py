@@ -0,0 +1,29 @@
+# backend/tests/test_search.py
+from conftest import raw_cursor
+
+
+def test_search_ranks_and_pages(client, create_recipe):
+    soup = create_recipe("Борщ", description="Суп со свёклой")
+    create_recipe("Оладьи", description="Сладкий завтрак")
+    salad = create_recipe("Винегрет", description="Салат", ingredients=(("Свёкла", 2, "шт"),))
+
+    response = client.get("/api/recipes/search", params={"q": "свёкл", "limit": 1})
+    assert response.status_code == 200
+    rest = client.get("/api/recipes/search", params={"q": "свёкл", "limit": 1, "cursor": response.headers["X-Next-Cursor"]})
+    assert {r["id"] for r in response.json() + rest.json()} == {soup["id"], salad["id"]}
+
+
+def test_search_candidates_are_the_most_relevant_hits(client, create_recipe, monkeypatch):
+    import crud
+
+    best = create_recipe("Пирог с вишней", description="Пирог")["id"]
+    for i in range(3):
+        create_recipe(f"Выпечка {i}", description="Тесто для пирог")
+    monkeypatch.setattr(crud, "SEARCH_MAX_CANDIDATES", 2)
+    found = [r["id"] for r in client.get("/api/recipes/search", params={"q": "пирог"}).json()]
+    assert len(found) == 2 and found[0] == best
+
+
+def test_search_rejects_malformed_cursor(client, db):
+    for bad in ({"k": "r", "v": [0.5]}, {"k": "r", "v": ["best", 1]}):
+        assert client.get("/api/recipes/search", params={"q": "суп", "cursor": raw_cursor(bad)}).status_code == 400
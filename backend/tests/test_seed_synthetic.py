@@ -0,0 +1,22 @@
+# backend/tests/test_seed_synthetic.py
+from sqlalchemy import text
+
+import seed_synthetic
+
+
+def test_generate_backfills_search_vectors_and_recounts_cube(db, monkeypatch):
+    monkeypatch.setattr(seed_synthetic, "CHUNK_SIZE", 7)
+
+    summary = seed_synthetic.generate(recipes=30, users=10, ingredients=20, log=lambda *_: None)
+
+    assert summary["recipes"] == 30
+    assert db.execute(text("SELECT count(*) FROM recipes WHERE search_vector IS NULL")).scalar() == 0
+    cube = db.execute(text("SELECT category, cuisine, diet, cook_bucket, n FROM recipe_facet_cube WHERE n > 0")).all()
+    recount = db.execute(text(
+        "SELECT coalesce(category, ''), coalesce(cuisine, ''), coalesce(diet, ''), cook_time_bucket(cook_time), count(*)"
+        " FROM recipes GROUP BY 1, 2, 3, 4"
+    )).all()
+    assert sorted(cube) == sorted(recount)
+    assert db.execute(text(
+        "SELECT tgenabled FROM pg_trigger WHERE tgname = 'recipes_facet_cube_update'"
+    )).scalar() == "O"
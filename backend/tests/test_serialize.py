@@ -0,0 +1,17 @@
+# backend/tests/test_serialize.py
+
+
+def test_listing_query_count_does_not_grow_with_the_page(client, create_recipe):
+    def listing_queries() -> int:
+        response = client.get("/api/recipes/all")  # every create drops the cached pages
+        assert response.status_code == 200
+        return int(response.headers["X-DB-Query-Count"])
+
+    create_recipe("Омлет", (("Яйца", 2, "шт"), ("Молоко", 100, "мл")))
+    create_recipe("Каша", (("Гречка", 100, "г"),))
+    two = listing_queries()
+    assert two > 0
+    for i in range(6):
+        create_recipe(f"Блины {i}", (("Мука", 200, "г"), ("Яйца", 2, "шт"), ("Молоко", 300, "мл")))
+    assert listing_queries() == two
+    assert [len(r["ingredients"]) for r in client.get("/api/recipes/all").json()][-2:] == [1, 2]
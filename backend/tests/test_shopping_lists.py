@@ -0,0 +1,50 @@
+# backend/tests/test_shopping_lists.py
+from crud import aggregate_ingredients
+
+
+def test_aggregate_converts_units_and_merges_names():
+    rows = [
+        (1, "Мука", 500, "г"),
+        (2, "мука", 1, "кг"),
+        (1, "Молоко", 300, "мл."),
+        (2, "Яйца", 2, "шт"),
+        (2, "Соль", 1, "щепотка"),
+        (1, "Соль", 5, "г"),
+        (1, "Масло", 1, "ст. л."),
+        (2, "масло", 1, "Ст. л."),
+    ]
+    assert aggregate_ingredients(rows, {1: 1, 2: 2}) == [
+        {"ingredient": "Масло", "quantity": 3.0, "unit": "ст. л."},
+        {"ingredient": "Молоко", "quantity": 300.0, "unit": "мл"},
+        {"ingredient": "Мука", "quantity": 2.5, "unit": "кг"},
+        {"ingredient": "Соль", "quantity": 2.0, "unit": "щепотка"},
+        {"ingredient": "Соль", "quantity": 5.0, "unit": "г"},
+        {"ingredient": "Яйца", "quantity": 4.0, "unit": "шт"},
+    ]
+
+
+def test_generate_shopping_list(client, auth_headers, create_recipe):
+    pancakes = create_recipe("Блины", ingredients=(("Мука", 200, "г"), ("Молоко", 500, "мл")))
+    bread = create_recipe("Хлеб", ingredients=(("Мука", 400, "г"),))
+    body = {"title": "На выходные", "recipes": [
+        {"recipe_id": pancakes["id"], "servings": 2},
+        {"recipe_id": bread["id"]},
+        {"recipe_id": pancakes["id"]},
+    ]}
+
+    response = client.post("/api/shopping-lists/generate", json=body, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["items"] == [
+        {"ingredient": "Молоко", "quantity": 1.5, "unit": "л"},
+        {"ingredient": "Мука", "quantity": 1.0, "unit": "кг"},
+    ]
+
+
+def test_generate_shopping_list_rejects_bad_input(client, auth_headers, create_recipe):
+    recipe = create_recipe("Блины")
+    url = "/api/shopping-lists/generate"
+    unknown = {"title": "x", "recipes": [{"recipe_id": recipe["id"]}, {"recipe_id": 999999}]}
+    assert client.post(url, json=unknown, headers=auth_headers).status_code == 404
+    zero = {"title": "x", "recipes": [{"recipe_id": recipe["id"], "servings": 0}]}
+    assert client.post(url, json=zero, headers=auth_headers).status_code == 422
+    assert client.post(url, json={"title": "x", "recipes": []}, headers=auth_headers).status_code == 400
@@ -0,0 +1,54 @@
+# backend/tests/test_storage.py
+import io
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from storage import LocalImageStorage, save_image
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalImageStorage(str(tmp_path / "static" / "images"), str(tmp_path / "incoming"))
+
+
+def test_uploads_are_spooled_outside_the_served_directory(store):
+    served = os.path.abspath(store.directory)
+    assert not os.path.abspath(store.temp_dir()).startswith(served)
+
+    url = save_image(io.BytesIO(b"image bytes"), "photo.png", store)
+    again = save_image(io.BytesIO(b"image bytes"), "copy.png", store)
+    assert url == again and url.startswith("/static/images/") and url.endswith(".png")
+    assert os.listdir(store.directory) == [store.name_from_url(url)]
+    assert os.listdir(store.temp_dir()) == []
+
+
+def test_oversized_upload_is_rejected_and_removed(store):
+    with pytest.raises(HTTPException) as error:
+        save_image(io.BytesIO(b"x" * 10), "big.jpg", store, max_bytes=4)
+    assert error.value.status_code == 413
+    assert os.listdir(store.directory) == os.listdir(store.temp_dir()) == []
+
+
+def test_upload_over_the_body_limit_is_rejected_before_parsing(client, auth_headers, monkeypatch):
+    import main
+
+    middleware = next(m for m in main.app.user_middleware if m.cls.__name__ == "UploadSizeLimitMiddleware")
+    monkeypatch.setitem(middleware.kwargs, "max_bytes", 1000)
+    main.app.middleware_stack = main.app.build_middleware_stack()
+    try:
+        files = {"image": ("photo.png", b"x" * 2000, "image/png")}
+        response = client.post("/api/recipes/upload", data={"recipe_json": "{}"}, files=files, headers=auth_headers)
+        assert response.status_code == 413
+
+        def chunked():
+            yield b"x" * 600
+            yield b"x" * 600
+
+        headers = {**auth_headers, "Content-Type": "multipart/form-data; boundary=b"}
+        response = client.post("/api/recipes/upload", content=chunked(), headers=headers)
+        assert response.status_code == 413
+    finally:
+        monkeypatch.undo()
+        main.app.middleware_stack = main.app.build_middleware_stack()
@@ -0,0 +1,39 @@
+# backend/tests/test_thumbnails.py
+import io
+import os
+import threading
+
+import pytest
+
+import thumbnails
+from storage import LocalImageStorage, save_image
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def test_variants_are_named_by_their_real_width(tmp_path):
+    store = LocalImageStorage(str(tmp_path / "images"), str(tmp_path / "incoming"))
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 200), "orange").save(buffer, "PNG")
+    name = store.name_from_url(save_image(io.BytesIO(buffer.getvalue()), "photo.png", store))
+
+    data = thumbnails.build_variants(store, name)
+    assert [v["width"] for v in data["variants"]] == [160, 300]
+    stem = os.path.splitext(name)[0]
+    for variant in data["variants"]:
+        assert variant["webp"].endswith(f"{stem}_{variant['width']}.webp")
+        with Image.open(os.path.join(store.directory, store.name_from_url(variant["jpeg"]))) as image:
+            assert image.width == variant["width"]
+    assert data["placeholder"].startswith("data:image/jpeg;base64,")
+
+
+def test_schedule_skips_images_beyond_the_pending_limit(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(thumbnails, "_pending", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(thumbnails, "process_image", lambda url: release.wait(5))
+
+    assert thumbnails.schedule_image_processing("/static/images/a.png") is True
+    assert thumbnails.schedule_image_processing("/static/images/b.png") is False
+    release.set()
+    thumbnails._executor.submit(lambda: None).result(timeout=5)
+    assert thumbnails._pending.acquire(timeout=5)
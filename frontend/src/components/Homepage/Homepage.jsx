@@ -1,6 +1,7 @@
 import React, { useState, useEffect, useRef } from "react";
 import "./Homepage.css";
 import Header from "../Header/header.jsx";
+import RecipeImage from "../RecipeImage/RecipeImage.jsx";
 
 // функция для генерации случайных изображений
 const generatePins = (count = 10, start = 1) => {
@@ -48,7 +49,9 @@ function Homepage() {
         <div className="grid">
           {pins.map((pin) => (
             <div key={pin.id} className="pin">
-              <a href={`/recipe/${pin.id}`}><img src={pin.image} alt={pin.title} loading="" /></a>
+              <a href={`/recipe/${pin.id}`}>
+                <RecipeImage image={pin.image} variants={pin.image_variants} alt={pin.title} sizes="(max-width: 600px) 50vw, 240px" />
+              </a>
               <p>{pin.title}</p>
 
             </div>
@@ -1,22 +1,33 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 
+// Infinite scroll over /api/recipes/all using the keyset cursor from the X-Next-Cursor header,
+// so later pages are as cheap as the first one.
 export default function useRecipes(page = 1, pageSize = 10) {
   const [recipes, setRecipes] = useState([])
   const [loading, setLoading] = useState(false)
+  const [hasMore, setHasMore] = useState(true)
+  const cursor = useRef(null)
 
   useEffect(() => {
+    if (page > 1 && !cursor.current) return
     let mounted = true
     setLoading(true)
-    fetch(`/api/recipes/all?skip=${(page-1)*pageSize}&limit=${pageSize}`)
-      .then(res => res.json())
+    const params = new URLSearchParams({ limit: pageSize })
+    if (cursor.current) params.set('cursor', cursor.current)
+    fetch(`/api/recipes/all?${params}`)
+      .then(res => {
+        cursor.current = res.headers.get('X-Next-Cursor')
+        return res.json()
+      })
       .then(data => {
         if (!mounted) return
         setRecipes(prev => [...prev, ...data])
+        setHasMore(Boolean(cursor.current))
       })
       .catch(err => console.error(err))
       .finally(() => setLoading(false))
     return () => { mounted = false }
   }, [page])
 
-  return { recipes, loading }
+  return { recipes, loading, hasMore }
 }
@@ -1,6 +1,7 @@
 import React from "react";
 import "./Recipe.css";
 import Header from "../Header/header.jsx";
+import RecipeImage from "../RecipeImage/RecipeImage.jsx";
 import { useParams, useNavigate } from "react-router-dom";
 
 function Recipe() {
@@ -42,7 +43,13 @@ function Recipe() {
         </button>
 
         <div className="recipe-card">
-          <img className="recipe-image" src={recipe.image} alt={recipe.title} />
+          <RecipeImage
+            className="recipe-image"
+            image={recipe.image}
+            variants={recipe.image_variants}
+            alt={recipe.title}
+            sizes="(max-width: 800px) 100vw, 800px"
+          />
 
           <div className="recipe-content">
             <h1 className="recipe-title">{recipe.title}</h1>
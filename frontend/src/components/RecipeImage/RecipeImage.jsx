@@ -0,0 +1,37 @@
+import React, { useState } from "react";
+import "./RecipeImage.css";
+
+// Recipe photo from RecipeResponse: picks a resized WebP/JPEG variant for the rendered
+// width (srcset) and shows the inlined placeholder until it loads. Without image_variants
+// (not processed yet, or mock data) the original `image` is used.
+function RecipeImage({ image, variants, alt, sizes = "300px", className = "" }) {
+  const [loaded, setLoaded] = useState(false);
+  const list = variants?.variants ?? [];
+
+  if (!list.length) {
+    return <img className={className} src={image} alt={alt} loading="lazy" />;
+  }
+
+  const srcSet = (key) => list.map((v) => `${v[key]} ${v.width}w`).join(", ");
+  const placeholder = variants.placeholder
+    ? { backgroundImage: `url(${variants.placeholder})` }
+    : undefined;
+
+  return (
+    <picture className={`recipe-image-frame ${loaded ? "loaded" : ""}`} style={placeholder}>
+      <source type="image/webp" srcSet={srcSet("webp")} sizes={sizes} />
+      <img
+        className={className}
+        src={list[list.length - 1].jpeg}
+        srcSet={srcSet("jpeg")}
+        sizes={sizes}
+        alt={alt}
+        loading="lazy"
+        decoding="async"
+        onLoad={() => setLoaded(true)}
+      />
+    </picture>
+  );
+}
+
+export default RecipeImage;
@@ -1,4 +1,4 @@
-import React, { useState } from "react";
+import React, { useEffect, useState } from "react";
 import Header from "../Header/header.jsx";
 import "./Upload.css";
 import { useNavigate } from "react-router-dom";
@@ -10,6 +10,7 @@ function Upload() {
   const [finishedPreview, setFinishedPreview] = useState(null); // url
   const [ingredients, setIngredients] = useState([]);
   const [ingredientInput, setIngredientInput] = useState("");
+  const [suggestions, setSuggestions] = useState([]);
   const [time, setTime] = useState(30); // minutes
 
   const [steps, setSteps] = useState([
@@ -32,6 +33,28 @@ function Upload() {
     setIngredientInput("");
   };
 
+  // Подсказки ингредиентов: самые используемые названия с введённым началом
+  useEffect(() => {
+    const q = ingredientInput.trim();
+    if (!q) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetch(`/api/ingredients/autocomplete?${new URLSearchParams({ q, limit: 8 })}`, {
+        signal: controller.signal,
+      })
+        .then((res) => (res.ok ? res.json() : []))
+        .then(setSuggestions)
+        .catch(() => {});
+    }, 150);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [ingredientInput]);
+
   const removeIngredient = (index) => {
     setIngredients((prev) => prev.filter((_, i) => i !== index));
   };
@@ -171,6 +194,7 @@ function Upload() {
                 value={ingredientInput}
                 onChange={(e) => setIngredientInput(e.target.value)}
                 placeholder="Добавить ингредиент"
+                list="ingredient-suggestions"
                 onKeyDown={(e) => {
                   if (e.key === "Enter") {
                     e.preventDefault();
@@ -178,6 +202,11 @@ function Upload() {
                   }
                 }}
               />
+              <datalist id="ingredient-suggestions">
+                {suggestions.map((s) => (
+                  <option key={s.name} value={s.name} />
+                ))}
+              </datalist>
               <button type="button" className="add-small" onClick={addIngredient}>
                 Добавить
               </button>